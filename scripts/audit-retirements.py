@@ -8,11 +8,12 @@ For every power plant in scored-sites.geojson and opportunities.geojson:
 4. Produce a before/after summary showing reclassifications
 """
 
-import json
 import os
 import openpyxl
 from collections import defaultdict
 
+from json_io import load_json, write_json
+
 SCRIPT_DIR = os.path.dirname(__file__)
 EIA_FILE = os.path.join(SCRIPT_DIR, "..", "data", "december_generator2025.xlsx")
 SCORED_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "scored-sites.geojson")
@@ -263,10 +264,8 @@ def main():
 
     # Load scored sites and opportunities
     print("\nLoading scored sites and opportunities...")
-    with open(SCORED_FILE) as f:
-        scored = json.load(f)
-    with open(OPPORTUNITIES_FILE) as f:
-        opps = json.load(f)
+    scored = load_json(SCORED_FILE)
+    opps = load_json(OPPORTUNITIES_FILE)
 
     scored_plants = [f for f in scored["features"]
                      if f["properties"].get("site_type") == "power_plant"]
@@ -488,8 +487,7 @@ def main():
 
         # Update power-plants.geojson: reclassify retooled/operating plants
         print("\nUpdating power-plants.geojson...")
-        with open(PLANTS_FILE) as f:
-            plants_data = json.load(f)
+        plants_data = load_json(PLANTS_FILE)
 
         reclassified = 0
         for feat in plants_data["features"]:
@@ -508,8 +506,7 @@ def main():
                             pass
                     break
 
-        with open(PLANTS_FILE, "w") as f:
-            json.dump(plants_data, f, indent=2)
+        write_json(plants_data, PLANTS_FILE)
         print("  Reclassified {} plants to 'retooled'".format(reclassified))
 
         # Update scored-sites.geojson: remove flagged plants
@@ -520,8 +517,7 @@ def main():
                                   f["properties"].get("state", "")) not in removed_names
                               or f["properties"].get("site_type") != "power_plant"]
         after_scored = len(scored["features"])
-        with open(SCORED_FILE, "w") as f:
-            json.dump(scored, f, indent=2)
+        write_json(scored, SCORED_FILE)
         print("  Scored sites: {} -> {} (removed {})".format(
             before_scored, after_scored, before_scored - after_scored))
 
@@ -533,8 +529,7 @@ def main():
                                 f["properties"].get("state", "")) not in removed_names
                             or f["properties"].get("opportunity_type") != "retired_plant"]
         after_opps = len(opps["features"])
-        with open(OPPORTUNITIES_FILE, "w") as f:
-            json.dump(opps, f, indent=2)
+        write_json(opps, OPPORTUNITIES_FILE)
         print("  Opportunities: {} -> {} (removed {})".format(
             before_opps, after_opps, before_opps - after_opps))
 
@@ -0,0 +1,20 @@
+"""
+Label cleaning shared by the Excel ingest scripts.
+"""
+
+
+def label_cleaner(clean):
+    """Return clean() memoized per distinct cell value.
+
+    Label columns such as state, fuel and status repeat a few dozen values
+    across every row, so each distinct value is cleaned once and every row
+    shares the resulting string.
+    """
+    labels = {}
+
+    def label(val):
+        s = labels.get(val)
+        if s is None:
+            s = labels[val] = clean(val)
+        return s
+    return label
@@ -16,6 +16,7 @@ Usage:
 
 import argparse
 import asyncio
+import heapq
 import json
 import os
 import sqlite3
@@ -26,6 +27,8 @@ from datetime import datetime, timedelta, timezone
 import aiosqlite
 import anthropic
 
+from json_io import load_json
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(SCRIPT_DIR, "..", "public", "data")
 SCORED_FILE = os.path.join(DATA_DIR, "scored-sites.geojson")
@@ -327,8 +330,7 @@ def load_sites():
         if not os.path.exists(filepath):
             print("  Warning: {} not found, skipping".format(filepath))
             continue
-        with open(filepath) as f:
-            geojson = json.load(f)
+        geojson = load_json(filepath)
         for feat in geojson["features"]:
             p = feat["properties"]
             coords = feat["geometry"]["coordinates"]
@@ -366,8 +368,9 @@ async def run(args):
             sys.exit(1)
         print("  Matched {} site(s) for '{}'".format(len(site_list), args.site))
     elif args.top:
-        site_list.sort(key=lambda s: -s.get("composite_score", 0))
-        site_list = site_list[:args.top]
+        # Top-N by score without sorting the whole list; ties keep file order
+        site_list = heapq.nlargest(args.top, site_list,
+                                   key=lambda s: s.get("composite_score", 0))
         print("  Using top {} sites by score".format(len(site_list)))
 
     if args.dry_run:
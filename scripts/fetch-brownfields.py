@@ -8,11 +8,12 @@ by registry_id, and outputs to public/data/epa-brownfields.geojson.
 
 import csv
 import io
-import json
 import os
 import urllib.request
 import zipfile
 
+from json_io import write_geojson
+
 SCRIPT_DIR = os.path.dirname(__file__)
 OUTPUT_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "epa-brownfields.geojson")
 FRS_URL = "https://ordsext.epa.gov/FLA/www3/state_files/national_single.zip"
@@ -196,11 +197,7 @@ def main():
             },
         })
 
-    geojson = {"type": "FeatureCollection", "features": features}
-
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f)
+    write_geojson(features, OUTPUT_FILE)
 
     file_size = os.path.getsize(OUTPUT_FILE) / 1024 / 1024
     print("")
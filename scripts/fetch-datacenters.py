@@ -9,6 +9,8 @@ import json
 import os
 import urllib.request
 
+from json_io import write_geojson
+
 SCRIPT_DIR = os.path.dirname(__file__)
 OUTPUT_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "data-centers.geojson")
 
@@ -141,11 +143,7 @@ def main():
             "properties": props,
         })
 
-    geojson = {"type": "FeatureCollection", "features": features}
-
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f)
+    write_geojson(features, OUTPUT_FILE)
 
     file_size = os.path.getsize(OUTPUT_FILE) / 1024
     print("")
@@ -13,11 +13,12 @@ uses representative 12-month averages from EIA wholesale market reports.
 
 import csv
 import io
-import json
 import os
 import urllib.request
 import urllib.error
 
+from json_io import write_geojson
+
 SCRIPT_DIR = os.path.dirname(__file__)
 OUTPUT_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "lmp-nodes.geojson")
 
@@ -242,11 +243,7 @@ def main():
             },
         })
 
-    geojson = {"type": "FeatureCollection", "features": features}
-
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f, indent=2)
+    write_geojson(features, OUTPUT_FILE)
 
     file_size = round(os.path.getsize(OUTPUT_FILE) / 1024, 1)
 
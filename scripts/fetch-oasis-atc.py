@@ -13,12 +13,13 @@ Output: public/data/oasis-atc.geojson
 
 import csv
 import io
-import json
 import math
 import os
 import urllib.request
 import urllib.error
 
+from json_io import load_json, write_geojson
+
 SCRIPT_DIR = os.path.dirname(__file__)
 SUBSTATIONS_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "substations.geojson")
 OUTPUT_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "oasis-atc.geojson")
@@ -219,8 +220,7 @@ def main():
     if not os.path.exists(SUBSTATIONS_FILE):
         print("  ERROR: substations.geojson not found")
         return
-    with open(SUBSTATIONS_FILE) as f:
-        subs_geojson = json.load(f)
+    subs_geojson = load_json(SUBSTATIONS_FILE)
     sub_lookup = build_substation_lookup(subs_geojson)
     print("  Substation name lookup: {} entries".format(len(sub_lookup)))
 
@@ -293,11 +293,7 @@ def main():
             },
         })
 
-    geojson = {"type": "FeatureCollection", "features": features}
-
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f, indent=2)
+    write_geojson(features, OUTPUT_FILE)
 
     file_size = round(os.path.getsize(OUTPUT_FILE) / 1024, 1)
 
@@ -12,6 +12,8 @@ import urllib.request
 import urllib.parse
 import time
 
+from json_io import write_geojson
+
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "..", "public", "data", "substations.geojson")
 
 BASE_URL = "https://services1.arcgis.com/PMShNXB1carltgVf/arcgis/rest/services/Electric_Substations/FeatureServer/0/query"
@@ -89,14 +91,7 @@ def main():
         offset += PAGE_SIZE
         time.sleep(0.5)
 
-    geojson = {
-        "type": "FeatureCollection",
-        "features": all_features,
-    }
-
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f)
+    write_geojson(all_features, OUTPUT_FILE)
 
     file_size = round(os.path.getsize(OUTPUT_FILE) / 1024 / 1024, 1)
 
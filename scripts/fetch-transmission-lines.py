@@ -11,6 +11,8 @@ import urllib.request
 import urllib.parse
 import time
 
+from json_io import write_geojson
+
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "..", "public", "data", "transmission-lines.geojson")
 
 BASE_URL = "https://services2.arcgis.com/FiaPA4ga0iQKduv3/arcgis/rest/services/US_Electric_Power_Transmission_Lines/FeatureServer/0/query"
@@ -72,14 +74,7 @@ def main():
         offset += PAGE_SIZE
         time.sleep(0.5)
 
-    geojson = {
-        "type": "FeatureCollection",
-        "features": all_features,
-    }
-
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f)
+    write_geojson(all_features, OUTPUT_FILE)
 
     file_size = round(os.path.getsize(OUTPUT_FILE) / 1024 / 1024, 1)
 
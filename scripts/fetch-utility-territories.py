@@ -19,6 +19,8 @@ import zipfile
 import time
 import openpyxl
 
+from json_io import write_geojson
+
 SCRIPT_DIR = os.path.dirname(__file__)
 OUTPUT_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "utility-territories.geojson")
 EIA_860_FILE = os.path.join(SCRIPT_DIR, "..", "data", "december_generator2025.xlsx")
@@ -409,14 +411,7 @@ def main():
     print()
     print("Step 5: Writing output...")
 
-    geojson = {
-        "type": "FeatureCollection",
-        "features": territories,
-    }
-
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f)
+    write_geojson(territories, OUTPUT_FILE)
 
     file_size = round(os.path.getsize(OUTPUT_FILE) / 1024 / 1024, 1)
 
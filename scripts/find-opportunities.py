@@ -17,15 +17,25 @@ All sites scored using the 4-dimension model:
 Output: public/data/opportunities.geojson
 """
 
-import json
+import bisect
+import concurrent.futures
+import functools
+import gzip
+import heapq
 import math
+import operator
 import os
 import sys
+import threading
 import time
 import urllib.request
 import urllib.parse
 import urllib.error
 
+from input_cache import cache_path, input_key, load_cache, save_cache
+from json_io import load_json, parse_json, write_geojson
+from spatial_index import build_nearest_index, build_range_index, nearest_point, points_within
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(SCRIPT_DIR, "..", "public", "data")
 
@@ -38,23 +48,35 @@ QUEUE_FILE = os.path.join(DATA_DIR, "queue-withdrawals.geojson")
 LMP_NODES_FILE = os.path.join(DATA_DIR, "lmp-nodes.geojson")
 ATC_FILE = os.path.join(DATA_DIR, "oasis-atc.geojson")
 OUTPUT_FILE = os.path.join(DATA_DIR, "opportunities.geojson")
+CACHE_FILE = cache_path("find-opportunities.pickle")
+CACHE_INPUTS = [
+    SUBSTATIONS_FILE, LMP_FILE, TERRITORIES_FILE, PLANTS_FILE,
+    BROWNFIELDS_FILE, QUEUE_FILE, ATC_FILE, os.path.abspath(__file__),
+]
 
 OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 RADIUS_MILES = 3.0
 RADIUS_METERS = int(RADIUS_MILES * 1609.34)  # ~4828 m
+# Haversine `a` term for RADIUS_MILES, so site scans skip the asin
+RADIUS_A = math.sin(RADIUS_MILES / 3958.8 / 2) ** 2
 MIN_GREENFIELD_ACRES = 50
 MIN_GREENFIELD_SQM = MIN_GREENFIELD_ACRES * 4046.86  # ~202,343 m^2
 MIN_SUBSTATION_KV = 345
-OVERPASS_DELAY_SEC = 10.0  # generous delay for public API
+OVERPASS_DELAY_SEC = 10.0  # generous delay between request starts
+OVERPASS_WORKERS = 2  # public API allows a couple of concurrent slots per IP
 OVERPASS_MAX_RETRIES = 2
 OVERPASS_BACKOFF_SEC = 30.0
 CLUSTER_RADIUS_MILES = 25.0  # aggressive clustering = fewer queries
 MAX_OSM_CLUSTERS = 20  # limit API queries to top clusters by voltage
 MAX_OUTPUT = 200
 SKIP_OSM = "--skip-osm" in sys.argv
+NO_CACHE = "--no-cache" in sys.argv
 
 # ── Scoring constants (same as score-sites.py) ──────────────────────────
 
+# Haversine `a` term for the 20-mile queue withdrawal radius
+QW_RADIUS_A = math.sin(20 / 3958.8 / 2) ** 2
+
 FLOOD_RISK_STATES = {"LA", "FL", "TX", "MS", "AL", "SC", "NC"}
 MODERATE_FLOOD_STATES = {"NJ", "DE", "MD", "VA", "GA", "CT", "RI", "MA", "HI"}
 
@@ -99,81 +121,117 @@ CONTAMINATION_SCORES = {
     "Geothermal": 60, "All Other": 60,
 }
 
+# Fuel types are interned to small ints at load; the score tables are indexed
+# by id, with a trailing slot holding the default for unknown fuels.
+FUEL_IDS = {name: i for i, name in enumerate(FUEL_TYPE_SCORES)}
+UNKNOWN_FUEL_ID = len(FUEL_IDS)
+FUEL_SCORE_BY_ID = tuple(FUEL_TYPE_SCORES.values()) + (50,)
+CONTAMINATION_SCORE_BY_ID = tuple(
+    CONTAMINATION_SCORES.get(name, 60) for name in FUEL_IDS) + (60,)
 
-# ── Math utilities ───────────────────────────────────────────────────────
-
-
-def haversine_miles(lat1, lon1, lat2, lon2):
-    R = 3958.8
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat / 2) ** 2 +
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-         math.sin(dlon / 2) ** 2)
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
-
-def clamp(v, lo=0.0, hi=100.0):
-    return max(lo, min(hi, v))
+# ── Math utilities ───────────────────────────────────────────────────────
 
 
 def polygon_area_sqm(geometry_nodes):
     """Approximate area from Overpass geometry nodes [{"lat":..,"lon":..}]."""
-    if len(geometry_nodes) < 3:
+    n = len(geometry_nodes)
+    if n < 3:
         return 0
-    coords = [(n["lon"], n["lat"]) for n in geometry_nodes]
-    avg_lat = sum(c[1] for c in coords) / len(coords)
+    # Offsets from the first node keep the shoelace sums well conditioned
+    lon0 = geometry_nodes[0]["lon"]
+    lat0 = geometry_nodes[0]["lat"]
+    lons = [node["lon"] - lon0 for node in geometry_nodes]
+    lats = [node["lat"] - lat0 for node in geometry_nodes]
+    avg_lat = lat0 + sum(lats) / n
     m_per_deg_lat = 111320
     m_per_deg_lon = 111320 * math.cos(math.radians(avg_lat))
-    pts = [(c[0] * m_per_deg_lon, c[1] * m_per_deg_lat) for c in coords]
-    n = len(pts)
-    area = 0
-    for i in range(n):
-        j = (i + 1) % n
-        area += pts[i][0] * pts[j][1]
-        area -= pts[j][0] * pts[i][1]
-    return abs(area) / 2
+    # Shoelace in degree space; the per-axis scale factors multiply out
+    cross = (sum(map(operator.mul, lons, lats[1:] + lats[:1])) -
+             sum(map(operator.mul, lats, lons[1:] + lons[:1])))
+    return abs(cross) * m_per_deg_lon * m_per_deg_lat / 2
 
 
 # ── Point-in-polygon (ray casting) ──────────────────────────────────────
 
 
-def point_in_ring(lat, lon, ring):
-    """Ray-casting. ring is [[lon,lat], ...] GeoJSON order."""
+def prepare_ring(ring):
+    """Precompute ray-casting edge coefficients. ring is [[lon,lat], ...].
+
+    Returns [(yi, yj, xi, slope), ...]. Horizontal edges are dropped since
+    the ray can never cross them.
+    """
+    edges = []
     n = len(ring)
-    inside = False
     j = n - 1
     for i in range(n):
         xi, yi = ring[i]   # lon, lat
         xj, yj = ring[j]
-        if ((yi > lat) != (yj > lat)) and \
-           (lon < (xj - xi) * (lat - yi) / (yj - yi) + xi):
-            inside = not inside
+        if yi != yj:
+            edges.append((yi, yj, xi, (xj - xi) / (yj - yi)))
         j = i
-    return inside
+    return edges
+
+
+def ring_area_deg2(ring):
+    """Unsigned shoelace area of a [[lon,lat], ...] ring in square degrees."""
+    area = 0.0
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        area += ring[j][0] * ring[i][1] - ring[i][0] * ring[j][1]
+        j = i
+    return abs(area) / 2
 
 
-def point_in_geometry(lat, lon, geometry):
-    """Check if (lat, lon) is inside GeoJSON Polygon or MultiPolygon."""
+def prepare_geometry(geometry):
+    """Prepare a GeoJSON Polygon or MultiPolygon for point_in_geometry.
+
+    Returns a list of (outer_edges, hole_edges_list) tuples ordered by
+    descending outer-ring area, so the polygon most likely to contain a
+    point is tested first.
+    """
     gtype = geometry.get("type", "")
     coords = geometry.get("coordinates", [])
     if gtype == "Polygon":
-        if not point_in_ring(lat, lon, coords[0]):
-            return False
-        for hole in coords[1:]:
-            if point_in_ring(lat, lon, hole):
-                return False
-        return True
+        polys = [coords]
     elif gtype == "MultiPolygon":
-        for poly in coords:
-            if point_in_ring(lat, lon, poly[0]):
-                in_hole = False
-                for hole in poly[1:]:
-                    if point_in_ring(lat, lon, hole):
-                        in_hole = True
-                        break
-                if not in_hole:
-                    return True
+        polys = coords
+    else:
+        return []
+    prepared = []
+    for poly in polys:
+        if not poly:
+            continue
+        holes = [prepare_ring(hole) for hole in poly[1:]]
+        prepared.append((ring_area_deg2(poly[0]), prepare_ring(poly[0]), holes))
+    prepared.sort(key=lambda x: -x[0])
+    return [(outer, holes) for _, outer, holes in prepared]
+
+
+def point_in_ring(lat, lon, edges):
+    """Ray-casting against edges from prepare_ring()."""
+    inside = False
+    for yi, yj, xi, slope in edges:
+        if ((yi > lat) != (yj > lat)) and lon < slope * (lat - yi) + xi:
+            inside = not inside
+    return inside
+
+
+def point_in_geometry(lat, lon, polygons):
+    """Check if (lat, lon) is inside polygons from prepare_geometry()."""
+    for outer, holes in polygons:
+        if not point_in_ring(lat, lon, outer):
+            continue
+        # Most polygons have no holes; skip the hole scan entirely
+        if not holes:
+            return True
+        in_hole = False
+        for hole in holes:
+            if point_in_ring(lat, lon, hole):
+                in_hole = True
+                break
+        if not in_hole:
+            return True
     return False
 
 
@@ -181,7 +239,8 @@ def point_in_geometry(lat, lon, geometry):
 
 
 def compute_sub_distance(dist):
-    return clamp(100 - dist * 2)
+    # dist >= 0, so only the floor can bind
+    return max(0.0, 100 - dist * 2)
 
 
 def compute_sub_voltage(max_volt):
@@ -195,21 +254,26 @@ def compute_sub_voltage(max_volt):
 
 
 def compute_gen_capacity(capacity):
-    return clamp((capacity - 50) / 1950 * 100)
+    score = (capacity - 50) / 1950 * 100
+    return 0.0 if score <= 0 else 100.0 if score >= 100 else score
 
 
 def compute_tx_lines(lines):
-    return clamp(lines / 8 * 100)
+    # Line counts are never negative, so only the ceiling can bind
+    return min(100.0, lines / 8 * 100)
 
 
 def compute_queue_withdrawal(qw_count, qw_mw):
     if qw_count == 0:
         return 30
-    count_score = clamp(30 + qw_count * 5, 30, 100)
-    mw_bonus = clamp(qw_mw / 5000 * 20, 0, 20)
-    return clamp(count_score + mw_bonus)
+    # qw_count >= 1 and mw_bonus >= 0 here, so only the ceilings can bind
+    count_score = min(100, 30 + qw_count * 5)
+    mw_bonus = qw_mw / 5000 * 20
+    mw_bonus = 0 if mw_bonus <= 0 else 20 if mw_bonus >= 20 else mw_bonus
+    return min(100.0, count_score + mw_bonus)
 
 
+@functools.lru_cache(maxsize=None)
 def compute_lmp_score(avg_lmp):
     if avg_lmp <= 20:
         return 95
@@ -232,7 +296,8 @@ def compute_lmp_score(avg_lmp):
 
 def compute_longitude(lon):
     if lon < -70:
-        return clamp(100 - (lon + 70) * -1.2)
+        # (lon + 70) * -1.2 > 0 west of -70, so only the floor can bind
+        return max(0.0, 100 - (lon + 70) * -1.2)
     return 100
 
 
@@ -244,8 +309,7 @@ def compute_latitude(lat):
     return 40
 
 
-def compute_broadband(state):
-    bb_pct = BROADBAND_COVERAGE.get(state, 80)
+def compute_broadband_tier(bb_pct):
     if bb_pct >= 95:
         return 95
     elif bb_pct >= 90:
@@ -259,6 +323,12 @@ def compute_broadband(state):
     return 35
 
 
+BROADBAND_SCORE_BY_STATE = {
+    state: compute_broadband_tier(pct) for state, pct in BROADBAND_COVERAGE.items()
+}
+UNKNOWN_BROADBAND_SCORE = compute_broadband_tier(80)
+
+
 def is_coastal_location(lat, lon, state):
     if state in FLOOD_RISK_STATES:
         if state == "FL":
@@ -278,26 +348,21 @@ def is_coastal_location(lat, lon, state):
 
 
 def compute_flood_zone(lat, lon, state):
-    if is_coastal_location(lat, lon, state):
-        return 35
-    elif state in MODERATE_FLOOD_STATES:
-        return 65
-    return 90
+    # Outside the Gulf/Atlantic risk states the score depends on the state
+    # alone, so only those states go through the coordinate heuristic
+    if state not in FLOOD_RISK_STATES:
+        return 65 if state in MODERATE_FLOOD_STATES else 90
+    return 35 if is_coastal_location(lat, lon, state) else 90
 
 
-def find_nearest_lmp(lat, lon, lmp_nodes):
-    best_dist = float("inf")
-    best = None
-    for n in lmp_nodes:
-        d = haversine_miles(lat, lon, n["lat"], n["lon"])
-        if d < best_dist:
-            best_dist = d
-            best = n
+def find_nearest_lmp(lat, lon, lmp_index):
+    _, best = nearest_point(lat, lon, lmp_index)
     if not best:
         return "", 0, 50
     return best["name"], best["avg_lmp"], compute_lmp_score(best["avg_lmp"])
 
 
+@functools.lru_cache(maxsize=None)
 def compute_atc_score(avg_atc_mw):
     """ATC scoring. High ATC = more transfer capability = high score."""
     if avg_atc_mw >= 3000:
@@ -315,23 +380,19 @@ def compute_atc_score(avg_atc_mw):
     return 20
 
 
-def find_nearest_atc(lat, lon, atc_nodes):
+def find_nearest_atc(lat, lon, atc_index):
     """Find nearest ATC interface and return (name, avg_atc_mw, atc_score)."""
-    best_dist = float("inf")
-    best = None
-    for n in atc_nodes:
-        d = haversine_miles(lat, lon, n["lat"], n["lon"])
-        if d < best_dist:
-            best_dist = d
-            best = n
+    _, best = nearest_point(lat, lon, atc_index)
     if not best:
         return "", 0, 50
     return best["name"], best["avg_atc_mw"], compute_atc_score(best["avg_atc_mw"])
 
 
-def score_site(site, sub_coords, qw_points, lmp_nodes, atc_nodes=None):
+def score_site(site, sub_index, qw_index, lmp_index, atc_index=None):
     """Score an opportunity site using the 4-dimension model.
 
+    qw_index comes from build_range_index(); the others from
+    build_nearest_index().
     Returns dict with all scoring fields matching ScoredSite interface.
     """
     lat = site["latitude"]
@@ -340,38 +401,24 @@ def score_site(site, sub_coords, qw_points, lmp_nodes, atc_nodes=None):
     opp_type = site["opportunity_type"]
 
     # ── Nearest 345kV+ substation ──
-    best_dist = float("inf")
-    best_sub = None
-    for sc in sub_coords:
-        d = haversine_miles(lat, lon, sc["lat"], sc["lon"])
-        if d < best_dist:
-            best_dist = d
-            best_sub = sc
+    best_dist, best_sub = nearest_point(lat, lon, sub_index)
 
     if not best_sub:
         return None
 
     # ── Queue withdrawals within 20 mi ──
-    deg_delta = 20 / 69.0
-    lon_delta = deg_delta / max(math.cos(math.radians(lat)), 0.01)
-    qw_count = 0
+    nearby = points_within(lat, lon, 20, QW_RADIUS_A, qw_index)
+    qw_count = len(nearby)
     qw_total_mw = 0.0
-    for qw in qw_points:
-        if abs(qw["lat"] - lat) > deg_delta:
-            continue
-        if abs(qw["lon"] - lon) > lon_delta:
-            continue
-        d = haversine_miles(lat, lon, qw["lat"], qw["lon"])
-        if d <= 20:
-            qw_count += 1
-            qw_total_mw += qw["total_mw"]
+    for qw in nearby:
+        qw_total_mw += qw["total_mw"]
 
     # ── LMP ──
-    lmp_name, lmp_avg, lmp_s = find_nearest_lmp(lat, lon, lmp_nodes)
+    lmp_name, lmp_avg, lmp_s = find_nearest_lmp(lat, lon, lmp_index)
 
     # ── ATC ──
-    if atc_nodes:
-        atc_name, atc_mw, atc_s = find_nearest_atc(lat, lon, atc_nodes)
+    if atc_index:
+        atc_name, atc_mw, atc_s = find_nearest_atc(lat, lon, atc_index)
     else:
         atc_name, atc_mw, atc_s = "", 0, 50
 
@@ -393,9 +440,11 @@ def score_site(site, sub_coords, qw_points, lmp_nodes, atc_nodes=None):
 
     # ── Site Readiness (20%) ──
     if opp_type == "retired_plant":
-        fuel_s = FUEL_TYPE_SCORES.get(site.get("fuel_type", ""), 50)
+        fuel_id = site.get("fuel_id", UNKNOWN_FUEL_ID)
+        fuel_s = FUEL_SCORE_BY_ID[fuel_id]
         cap = site.get("total_capacity_mw", 0)
-        scale_s = clamp((cap - 50) / 1450 * 100)
+        scale_s = (cap - 50) / 1450 * 100
+        scale_s = 0.0 if scale_s <= 0 else 100.0 if scale_s >= 100 else scale_s
         sr = fuel_s * 0.60 + scale_s * 0.40
     elif opp_type == "adaptive_reuse":
         fuel_s = 0
@@ -409,13 +458,13 @@ def score_site(site, sub_coords, qw_points, lmp_nodes, atc_nodes=None):
     # ── Connectivity (15%) ──
     lon_s = compute_longitude(lon)
     lat_s = compute_latitude(lat)
-    bb_s = compute_broadband(state)
+    bb_s = BROADBAND_SCORE_BY_STATE.get(state, UNKNOWN_BROADBAND_SCORE)
     co = lon_s * 0.40 + lat_s * 0.30 + bb_s * 0.30
 
     # ── Risk Factors (15%) ──
     flood_s = compute_flood_zone(lat, lon, state)
     if opp_type == "retired_plant":
-        contam_s = CONTAMINATION_SCORES.get(site.get("fuel_type", ""), 60)
+        contam_s = CONTAMINATION_SCORE_BY_ID[fuel_id]
         status_s = 80 if site.get("status") == "retiring" else 65
         rf = contam_s * 0.50 + status_s * 0.20 + flood_s * 0.30
     elif opp_type == "adaptive_reuse":
@@ -428,7 +477,7 @@ def score_site(site, sub_coords, qw_points, lmp_nodes, atc_nodes=None):
         rf = contam_s * 0.65 + flood_s * 0.35
 
     composite = ttp * 0.50 + sr * 0.20 + co * 0.15 + rf * 0.15
-    composite = round(clamp(composite), 1)
+    composite = round(0.0 if composite <= 0 else 100.0 if composite >= 100 else composite, 1)
 
     r = lambda v: round(v, 1)
     return {
@@ -479,10 +528,31 @@ def score_site(site, sub_coords, qw_points, lmp_nodes, atc_nodes=None):
 
 # ── Overpass API ─────────────────────────────────────────────────────────
 
+_overpass_lock = threading.Lock()
+_overpass_next_start = 0.0
+
+
+def wait_overpass_turn():
+    """Block until OVERPASS_DELAY_SEC has passed since the last request start.
+    Shared by all worker threads so the pool never exceeds the polite rate."""
+    global _overpass_next_start
+    with _overpass_lock:
+        now = time.monotonic()
+        start = max(now, _overpass_next_start)
+        _overpass_next_start = start + OVERPASS_DELAY_SEC
+    if start > now:
+        time.sleep(start - now)
 
-def query_overpass(lat, lon, attempt=0):
+
+def query_overpass(lat, lon, attempt=0, log=None):
     """Query OSM for industrial buildings and land parcels within 3 mi.
-    Retries with exponential backoff on 429/504 errors."""
+    Retries with exponential backoff on 429/504 errors.
+
+    Runs on the Overpass worker threads, so rather than printing it returns
+    (elements, log_lines) and the caller prints the lines in cluster order.
+    """
+    if log is None:
+        log = []
     query = (
         "[out:json][timeout:60];\n"
         "(\n"
@@ -498,33 +568,38 @@ def query_overpass(lat, lon, attempt=0):
         "out center geom tags;\n"
     ).format(r=RADIUS_METERS, lat=lat, lon=lon)
 
+    wait_overpass_turn()
     try:
         data = urllib.parse.urlencode({"data": query}).encode("utf-8")
         req = urllib.request.Request(OVERPASS_URL, data=data)
         req.add_header("User-Agent", "GridSite-OpportunityFinder/1.0")
+        req.add_header("Accept-Encoding", "gzip")
         with urllib.request.urlopen(req, timeout=90) as resp:
-            result = json.loads(resp.read().decode("utf-8"))
-        return result.get("elements", [])
+            body = resp.read()
+            if resp.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+        result = parse_json(body)
+        return result.get("elements", []), log
     except urllib.error.HTTPError as e:
         if e.code in (429, 504) and attempt < OVERPASS_MAX_RETRIES:
             wait = OVERPASS_BACKOFF_SEC * (attempt + 1)
-            print("      {} — retrying in {:.0f}s (attempt {})...".format(
+            log.append("      {} — retrying in {:.0f}s (attempt {})...".format(
                 e.code, wait, attempt + 2))
             time.sleep(wait)
-            return query_overpass(lat, lon, attempt + 1)
-        print("    Overpass HTTP error {}: {}".format(e.code, e.reason))
-        return []
+            return query_overpass(lat, lon, attempt + 1, log)
+        log.append("    Overpass HTTP error {}: {}".format(e.code, e.reason))
+        return [], log
     except urllib.error.URLError as e:
         if attempt < OVERPASS_MAX_RETRIES:
             wait = OVERPASS_BACKOFF_SEC * (attempt + 1)
-            print("      URL error — retrying in {:.0f}s...".format(wait))
+            log.append("      URL error — retrying in {:.0f}s...".format(wait))
             time.sleep(wait)
-            return query_overpass(lat, lon, attempt + 1)
-        print("    Overpass URL error: {}".format(e.reason))
-        return []
+            return query_overpass(lat, lon, attempt + 1, log)
+        log.append("    Overpass URL error: {}".format(e.reason))
+        return [], log
     except Exception as e:
-        print("    Overpass error: {}".format(e))
-        return []
+        log.append("    Overpass error: {}".format(e))
+        return [], log
 
 
 def classify_osm_element(elem):
@@ -559,34 +634,20 @@ def classify_osm_element(elem):
     return None
 
 
-# ── Main ─────────────────────────────────────────────────────────────────
-
-
-def main():
-    print("=" * 80)
-    print("OPPORTUNITY FINDER")
-    print("=" * 80)
-    print()
+# ── Data loading ─────────────────────────────────────────────────────────
 
-    # ── 1. Load data ──────────────────────────────────────────────────────
-
-    print("Loading data...")
 
-    with open(SUBSTATIONS_FILE) as f:
-        subs_geojson = json.load(f)
-    with open(LMP_FILE) as f:
-        lmp_geojson = json.load(f)
-    with open(TERRITORIES_FILE) as f:
-        terr_geojson = json.load(f)
-    with open(PLANTS_FILE) as f:
-        plants_geojson = json.load(f)
-    with open(QUEUE_FILE) as f:
-        queue_geojson = json.load(f)
+def load_datasets():
+    """Parse the input GeoJSON files into the lists used for scoring."""
+    subs_geojson = load_json(SUBSTATIONS_FILE)
+    lmp_geojson = load_json(LMP_FILE)
+    terr_geojson = load_json(TERRITORIES_FILE)
+    plants_geojson = load_json(PLANTS_FILE)
+    queue_geojson = load_json(QUEUE_FILE)
 
     brownfield_sites = []
     if os.path.exists(BROWNFIELDS_FILE):
-        with open(BROWNFIELDS_FILE) as f:
-            bf_geojson = json.load(f)
+        bf_geojson = load_json(BROWNFIELDS_FILE)
         for feat in bf_geojson["features"]:
             p = feat["properties"]
             coords = feat["geometry"]["coordinates"]
@@ -596,7 +657,6 @@ def main():
                 "state": p.get("state", ""),
                 "city": p.get("city", ""),
             })
-    print("  Brownfield sites: {:,}".format(len(brownfield_sites)))
 
     # Pre-extract data structures
     lmp_nodes = []
@@ -617,12 +677,11 @@ def main():
             surplus_territories.append({
                 "name": p.get("name", ""),
                 "state": p.get("state", ""),
-                "geometry": feat["geometry"],
+                "polygons": prepare_geometry(feat["geometry"]),
                 "ratio": p.get("ratio"),
                 # Pre-compute bounding box for fast rejection
                 "bbox": compute_bbox(feat["geometry"]),
             })
-    print("  Surplus utility territories: {}".format(len(surplus_territories)))
 
     # All 345kV+ substations for scoring
     all_hv_subs = []
@@ -638,7 +697,6 @@ def main():
                 "name": p.get("NAME", ""),
                 "state": p.get("STATE", ""),
             })
-    print("  Substations >= 345kV: {:,}".format(len(all_hv_subs)))
 
     # Queue withdrawals for scoring
     qw_points = []
@@ -649,13 +707,11 @@ def main():
             "lat": c[1], "lon": c[0],
             "total_mw": float(p.get("total_mw") or 0),
         })
-    print("  Queue withdrawals: {:,}".format(len(qw_points)))
 
     # Load ATC interfaces
     atc_nodes = []
     if os.path.exists(ATC_FILE):
-        with open(ATC_FILE) as f:
-            atc_geojson = json.load(f)
+        atc_geojson = load_json(ATC_FILE)
         for feat in atc_geojson["features"]:
             c = feat["geometry"]["coordinates"]
             p = feat["properties"]
@@ -664,9 +720,6 @@ def main():
                 "name": p.get("name", ""),
                 "avg_atc_mw": float(p.get("avg_atc_mw", 0)),
             })
-        print("  ATC interfaces: {:,}".format(len(atc_nodes)))
-    else:
-        print("  ATC file not found, skipping")
 
     # Power plants (retired/retiring) — exclude retooled (still have active generators)
     retired_plants = []
@@ -683,11 +736,75 @@ def main():
                 "state": p["state"],
                 "total_capacity_mw": p.get("total_capacity_mw", 0),
                 "fuel_type": p.get("fuel_type", ""),
+                "fuel_id": FUEL_IDS.get(p.get("fuel_type", ""), UNKNOWN_FUEL_ID),
                 "status": p["status"],
                 "planned_retirement_date": p.get("planned_retirement_date"),
                 "owner_name": p.get("owner_name", ""),
                 "utility_id": p.get("utility_id"),
             })
+
+    return {
+        "brownfield_sites": brownfield_sites,
+        "lmp_nodes": lmp_nodes,
+        "surplus_territories": surplus_territories,
+        "all_hv_subs": all_hv_subs,
+        "qw_points": qw_points,
+        "atc_nodes": atc_nodes,
+        "retired_plants": retired_plants,
+        "retooled_skipped": retooled_skipped,
+    }
+
+
+def load_datasets_cached():
+    """Return load_datasets(), reusing CACHE_FILE while its inputs are unchanged.
+
+    The cache key is the mtime and size of every input file plus this script,
+    so re-running ETL or editing the loaders invalidates it.
+    """
+    key = input_key(CACHE_INPUTS)
+    if not NO_CACHE:
+        data = load_cache(CACHE_FILE, key)
+        if data is not None:
+            print("  (using cached datasets from {})".format(
+                os.path.basename(CACHE_FILE)))
+            return data
+
+    data = load_datasets()
+    save_cache(CACHE_FILE, key, data)
+    return data
+
+
+# ── Main ─────────────────────────────────────────────────────────────────
+
+
+def main():
+    print("=" * 80)
+    print("OPPORTUNITY FINDER")
+    print("=" * 80)
+    print()
+
+    # ── 1. Load data ──────────────────────────────────────────────────────
+
+    print("Loading data...")
+
+    data = load_datasets_cached()
+    brownfield_sites = data["brownfield_sites"]
+    lmp_nodes = data["lmp_nodes"]
+    surplus_territories = data["surplus_territories"]
+    all_hv_subs = data["all_hv_subs"]
+    qw_points = data["qw_points"]
+    atc_nodes = data["atc_nodes"]
+    retired_plants = data["retired_plants"]
+    retooled_skipped = data["retooled_skipped"]
+
+    print("  Brownfield sites: {:,}".format(len(brownfield_sites)))
+    print("  Surplus utility territories: {}".format(len(surplus_territories)))
+    print("  Substations >= 345kV: {:,}".format(len(all_hv_subs)))
+    print("  Queue withdrawals: {:,}".format(len(qw_points)))
+    if os.path.exists(ATC_FILE):
+        print("  ATC interfaces: {:,}".format(len(atc_nodes)))
+    else:
+        print("  ATC file not found, skipping")
     print("  Retired/retiring plants: {:,}".format(len(retired_plants)))
     if retooled_skipped > 0:
         print("  Retooled plants excluded: {:,}".format(retooled_skipped))
@@ -697,28 +814,24 @@ def main():
     print()
     print("Finding qualifying substations (345kV+ / low LMP / surplus territory)...")
 
+    lmp_index = build_nearest_index(lmp_nodes)
     qualifying = []
     for sub in all_hv_subs:
         # Check nearest LMP node is "low"
-        best_dist = float("inf")
-        best_lmp = None
-        for lmp in lmp_nodes:
-            d = haversine_miles(sub["lat"], sub["lon"], lmp["lat"], lmp["lon"])
-            if d < best_dist:
-                best_dist = d
-                best_lmp = lmp
+        _, best_lmp = nearest_point(sub["lat"], sub["lon"], lmp_index)
         if not best_lmp or best_lmp["lmp_class"] != "low":
             continue
 
         # Check if within surplus territory (with bbox pre-filter)
+        sub_lat = sub["lat"]
+        sub_lon = sub["lon"]
         in_surplus = False
         terr_name = ""
         for terr in surplus_territories:
-            bbox = terr["bbox"]
-            if (sub["lat"] < bbox["minlat"] or sub["lat"] > bbox["maxlat"] or
-                    sub["lon"] < bbox["minlon"] or sub["lon"] > bbox["maxlon"]):
+            minlat, maxlat, minlon, maxlon = terr["bbox"]
+            if not (minlat <= sub_lat <= maxlat and minlon <= sub_lon <= maxlon):
                 continue
-            if point_in_geometry(sub["lat"], sub["lon"], terr["geometry"]):
+            if point_in_geometry(sub_lat, sub_lon, terr["polygons"]):
                 in_surplus = True
                 terr_name = terr["name"]
                 break
@@ -736,8 +849,7 @@ def main():
     if not qualifying:
         print("  No qualifying substations found. Check data overlap.")
         # Write empty output
-        with open(OUTPUT_FILE, "w") as f:
-            json.dump({"type": "FeatureCollection", "features": []}, f, indent=2)
+        write_geojson([], OUTPUT_FILE)
         return
 
     # Print summary by state
@@ -764,31 +876,36 @@ def main():
     seen = set()
     raw_sites = []
 
+    # Plants and brownfields are bucketed into grid cells once, so
+    # each substation only checks the handful of cells around it instead of
+    # scanning every site; matches come back in input order as before
+    plant_index = build_range_index(retired_plants)
+    bf_index = build_range_index(brownfield_sites)
+
     # 4a. Retired plants near qualifying substations
     print("  Scanning retired plants...")
     for sub in qualifying:
-        for plant in retired_plants:
-            d = haversine_miles(sub["lat"], sub["lon"], plant["lat"], plant["lon"])
-            if d <= RADIUS_MILES:
-                key = (round(plant["lat"], 3), round(plant["lon"], 3))
-                if key in seen:
-                    continue
-                seen.add(key)
-                raw_sites.append({
-                    "plant_name": plant["plant_name"],
-                    "state": plant["state"],
-                    "latitude": plant["lat"],
-                    "longitude": plant["lon"],
-                    "total_capacity_mw": plant["total_capacity_mw"],
-                    "fuel_type": plant["fuel_type"],
-                    "status": plant["status"],
-                    "planned_retirement_date": plant.get("planned_retirement_date"),
-                    "opportunity_type": "retired_plant",
-                    "qualifying_substation": sub["name"],
-                    "qualifying_sub_kv": sub["max_volt"],
-                    "owner_name": plant.get("owner_name", ""),
-                    "utility_id": plant.get("utility_id"),
-                })
+        for plant in points_within(sub["lat"], sub["lon"], RADIUS_MILES, RADIUS_A, plant_index):
+            key = (round(plant["lat"], 3), round(plant["lon"], 3))
+            if key in seen:
+                continue
+            seen.add(key)
+            raw_sites.append({
+                "plant_name": plant["plant_name"],
+                "state": plant["state"],
+                "latitude": plant["lat"],
+                "longitude": plant["lon"],
+                "total_capacity_mw": plant["total_capacity_mw"],
+                "fuel_type": plant["fuel_type"],
+                "fuel_id": plant["fuel_id"],
+                "status": plant["status"],
+                "planned_retirement_date": plant.get("planned_retirement_date"),
+                "opportunity_type": "retired_plant",
+                "qualifying_substation": sub["name"],
+                "qualifying_sub_kv": sub["max_volt"],
+                "owner_name": plant.get("owner_name", ""),
+                "utility_id": plant.get("utility_id"),
+            })
     print("    Retired plants found: {}".format(
         sum(1 for s in raw_sites if s["opportunity_type"] == "retired_plant")))
 
@@ -796,32 +913,23 @@ def main():
     print("  Scanning brownfield sites...")
     bf_count_before = len(raw_sites)
     for sub in qualifying:
-        # Fast bounding-box pre-filter
-        deg_delta = RADIUS_MILES / 69.0
-        lon_delta = deg_delta / max(math.cos(math.radians(sub["lat"])), 0.01)
-        for bf in brownfield_sites:
-            if abs(bf["lat"] - sub["lat"]) > deg_delta:
-                continue
-            if abs(bf["lon"] - sub["lon"]) > lon_delta:
+        for bf in points_within(sub["lat"], sub["lon"], RADIUS_MILES, RADIUS_A, bf_index):
+            key = (round(bf["lat"], 3), round(bf["lon"], 3))
+            if key in seen:
                 continue
-            d = haversine_miles(sub["lat"], sub["lon"], bf["lat"], bf["lon"])
-            if d <= RADIUS_MILES:
-                key = (round(bf["lat"], 3), round(bf["lon"], 3))
-                if key in seen:
-                    continue
-                seen.add(key)
-                raw_sites.append({
-                    "plant_name": bf["name"],
-                    "state": bf["state"],
-                    "latitude": bf["lat"],
-                    "longitude": bf["lon"],
-                    "total_capacity_mw": 0,
-                    "fuel_type": "Brownfield",
-                    "status": "brownfield",
-                    "opportunity_type": "adaptive_reuse",
-                    "qualifying_substation": sub["name"],
-                    "qualifying_sub_kv": sub["max_volt"],
-                })
+            seen.add(key)
+            raw_sites.append({
+                "plant_name": bf["name"],
+                "state": bf["state"],
+                "latitude": bf["lat"],
+                "longitude": bf["lon"],
+                "total_capacity_mw": 0,
+                "fuel_type": "Brownfield",
+                "status": "brownfield",
+                "opportunity_type": "adaptive_reuse",
+                "qualifying_substation": sub["name"],
+                "qualifying_sub_kv": sub["max_volt"],
+            })
     print("    Brownfield sites found: {}".format(len(raw_sites) - bf_count_before))
 
     # 4c. OpenStreetMap query for each cluster
@@ -829,6 +937,7 @@ def main():
     osm_greenfield = 0
     if SKIP_OSM:
         print("  Skipping Overpass API (--skip-osm flag)")
+        clusters = []
     else:
         # Sort clusters by max voltage (highest first) and limit
         clusters.sort(key=lambda c: -max(s["max_volt"] for s in c["subs"]))
@@ -836,89 +945,92 @@ def main():
         print("  Querying OpenStreetMap Overpass API ({} of {} clusters)...".format(
             len(osm_clusters), len(clusters)))
         clusters = osm_clusters
-    for ci, cluster in enumerate(clusters):
-        if SKIP_OSM:
-            break
-        center_lat = cluster["lat"]
-        center_lon = cluster["lon"]
-        sub_names = [s["name"] for s in cluster["subs"]]
-        sub_state = cluster["subs"][0].get("state", "")
-        sub_name = cluster["subs"][0]["name"]
-        sub_kv = max(s["max_volt"] for s in cluster["subs"])
-
-        print("    Cluster {}/{}: [{:.2f}, {:.2f}] ({} subs, state={})".format(
-            ci + 1, len(clusters), center_lat, center_lon,
-            len(cluster["subs"]), sub_state))
-
-        elements = query_overpass(center_lat, center_lon)
-        print("      OSM elements returned: {}".format(len(elements)))
-
-        debug_no_center = 0
-        debug_no_classify = 0
-        debug_tag_samples = []
-        for elem in elements:
-            center = elem.get("center", {})
-            lat = center.get("lat")
-            lon = center.get("lon")
-            if lat is None or lon is None:
-                debug_no_center += 1
-                # Try getting coords from first geometry node
-                geom = elem.get("geometry", [])
-                if geom and isinstance(geom, list) and len(geom) > 0:
-                    if isinstance(geom[0], dict):
-                        lat = geom[0].get("lat")
-                        lon = geom[0].get("lon")
-                    elif isinstance(geom[0], (list, tuple)):
-                        lat = geom[0][1] if len(geom[0]) > 1 else None
-                        lon = geom[0][0] if len(geom[0]) > 0 else None
+    # Queries run on a small worker pool so HTTP latency overlaps, while
+    # wait_overpass_turn() still spaces request starts OVERPASS_DELAY_SEC apart.
+    # Results and their log lines come back in cluster order and are printed
+    # here, so worker output never interleaves with the per-cluster report.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=OVERPASS_WORKERS) as executor:
+        cluster_results = executor.map(
+            lambda c: query_overpass(c["lat"], c["lon"]), clusters)
+        for ci, (cluster, (elements, overpass_log)) in enumerate(zip(clusters, cluster_results)):
+            center_lat = cluster["lat"]
+            center_lon = cluster["lon"]
+            sub_names = [s["name"] for s in cluster["subs"]]
+            sub_state = cluster["subs"][0].get("state", "")
+            sub_name = cluster["subs"][0]["name"]
+            sub_kv = max(s["max_volt"] for s in cluster["subs"])
+
+            print("    Cluster {}/{}: [{:.2f}, {:.2f}] ({} subs, state={})".format(
+                ci + 1, len(clusters), center_lat, center_lon,
+                len(cluster["subs"]), sub_state))
+            for line in overpass_log:
+                print(line)
+
+            print("      OSM elements returned: {}".format(len(elements)))
+
+            debug_no_center = 0
+            debug_no_classify = 0
+            debug_tag_samples = []
+            for elem in elements:
+                center = elem.get("center", {})
+                lat = center.get("lat")
+                lon = center.get("lon")
                 if lat is None or lon is None:
+                    debug_no_center += 1
+                    # Try getting coords from first geometry node
+                    geom = elem.get("geometry", [])
+                    if geom and isinstance(geom, list) and len(geom) > 0:
+                        if isinstance(geom[0], dict):
+                            lat = geom[0].get("lat")
+                            lon = geom[0].get("lon")
+                        elif isinstance(geom[0], (list, tuple)):
+                            lat = geom[0][1] if len(geom[0]) > 1 else None
+                            lon = geom[0][0] if len(geom[0]) > 0 else None
+                    if lat is None or lon is None:
+                        continue
+
+                result = classify_osm_element(elem)
+                if result is None:
+                    debug_no_classify += 1
+                    if len(debug_tag_samples) < 3:
+                        debug_tag_samples.append(elem.get("tags", {}))
                     continue
 
-            result = classify_osm_element(elem)
-            if result is None:
-                debug_no_classify += 1
-                if len(debug_tag_samples) < 3:
-                    debug_tag_samples.append(elem.get("tags", {}))
-                continue
+                opp_type, label, area_acres = result
 
-            opp_type, label, area_acres = result
-
-            key = (round(lat, 3), round(lon, 3))
-            if key in seen:
-                continue
-            seen.add(key)
+                key = (round(lat, 3), round(lon, 3))
+                if key in seen:
+                    continue
+                seen.add(key)
 
-            site = {
-                "plant_name": label,
-                "state": sub_state,
-                "latitude": lat,
-                "longitude": lon,
-                "total_capacity_mw": 0,
-                "fuel_type": "Industrial" if opp_type == "adaptive_reuse" else "Greenfield",
-                "status": "opportunity",
-                "opportunity_type": opp_type,
-                "qualifying_substation": sub_name,
-                "qualifying_sub_kv": sub_kv,
-            }
-            if area_acres > 0:
-                site["area_acres"] = round(area_acres, 1)
-            raw_sites.append(site)
-
-            if opp_type == "adaptive_reuse":
-                osm_adaptive += 1
-            else:
-                osm_greenfield += 1
-
-        if debug_no_center > 0 or debug_no_classify > 0:
-            print("      (no center: {}, not classified: {})".format(
-                debug_no_center, debug_no_classify))
-        if debug_tag_samples:
-            for tags in debug_tag_samples[:2]:
-                print("        sample unclassified: {}".format(
-                    {k: v for k, v in tags.items() if k in ("building", "landuse", "man_made", "name")}))
-
-        if ci < len(clusters) - 1:
-            time.sleep(OVERPASS_DELAY_SEC)
+                site = {
+                    "plant_name": label,
+                    "state": sub_state,
+                    "latitude": lat,
+                    "longitude": lon,
+                    "total_capacity_mw": 0,
+                    "fuel_type": "Industrial" if opp_type == "adaptive_reuse" else "Greenfield",
+                    "status": "opportunity",
+                    "opportunity_type": opp_type,
+                    "qualifying_substation": sub_name,
+                    "qualifying_sub_kv": sub_kv,
+                }
+                if area_acres > 0:
+                    site["area_acres"] = round(area_acres, 1)
+                raw_sites.append(site)
+
+                if opp_type == "adaptive_reuse":
+                    osm_adaptive += 1
+                else:
+                    osm_greenfield += 1
+
+            if debug_no_center > 0 or debug_no_classify > 0:
+                print("      (no center: {}, not classified: {})".format(
+                    debug_no_center, debug_no_classify))
+            if debug_tag_samples:
+                for tags in debug_tag_samples[:2]:
+                    print("        sample unclassified: {}".format(
+                        {k: v for k, v in tags.items() if k in ("building", "landuse", "man_made", "name")}))
 
     print("    OSM adaptive reuse: {}".format(osm_adaptive))
     print("    OSM greenfield (50+ acres): {}".format(osm_greenfield))
@@ -929,39 +1041,48 @@ def main():
     print()
     print("Scoring {} opportunity sites...".format(len(raw_sites)))
 
+    sub_index = build_nearest_index(all_hv_subs)
+    qw_index = build_range_index(qw_points)
+    atc_index = build_nearest_index(atc_nodes)
+
     scored = []
     for site in raw_sites:
-        result = score_site(site, all_hv_subs, qw_points, lmp_nodes, atc_nodes)
+        result = score_site(site, sub_index, qw_index, lmp_index, atc_index)
         if result:
             scored.append(result)
 
-    # Sort by composite score, but reserve slots per type for diversity
-    scored.sort(key=lambda x: -x["composite_score"])
+    # Rank by composite score, but reserve slots per type for diversity.
+    # Only the top-K of each ranking is needed, so use heaps, not a full sort.
+    # Sites are tracked by position in `scored` (raw sites were already
+    # deduplicated by location), so no set of float coordinate tuples.
+    scores = [s["composite_score"] for s in scored]
+    by_score = scores.__getitem__
 
     # Reserve at least MIN_PER_TYPE slots for each opportunity type
     MIN_PER_TYPE = 10
     by_type = {"retired_plant": [], "adaptive_reuse": [], "greenfield": []}
-    for s in scored:
-        by_type[s["opportunity_type"]].append(s)
+    for i, s in enumerate(scored):
+        by_type[s["opportunity_type"]].append(i)
 
-    top = []
-    used = set()
+    picked = []
+    used = bytearray(len(scored))
     # First pass: guarantee MIN_PER_TYPE from each type (best of each)
     for t in ("retired_plant", "greenfield", "adaptive_reuse"):
-        for s in by_type[t][:MIN_PER_TYPE]:
-            key = (s["latitude"], s["longitude"])
-            if key not in used:
-                top.append(s)
-                used.add(key)
-    # Second pass: fill remaining slots with highest-scoring sites overall
-    for s in scored:
-        if len(top) >= MAX_OUTPUT:
+        for i in heapq.nlargest(MIN_PER_TYPE, by_type[t], key=by_score):
+            picked.append(i)
+            used[i] = 1
+    # Second pass: fill remaining slots with highest-scoring sites overall.
+    # At most len(picked) of the MAX_OUTPUT best are already used, so those
+    # are enough to fill the remaining slots.
+    for i in heapq.nlargest(MAX_OUTPUT, range(len(scored)), key=by_score):
+        if len(picked) >= MAX_OUTPUT:
             break
-        key = (s["latitude"], s["longitude"])
-        if key not in used:
-            top.append(s)
-            used.add(key)
-    top.sort(key=lambda x: -x["composite_score"])
+        if not used[i]:
+            picked.append(i)
+            used[i] = 1
+    # reverse=True keeps the sort stable, so ties stay in pick order
+    picked.sort(key=by_score, reverse=True)
+    top = [scored[i] for i in picked]
 
     # ── 6. Output GeoJSON ─────────────────────────────────────────────────
 
@@ -976,10 +1097,7 @@ def main():
             "properties": s,
         })
 
-    geojson = {"type": "FeatureCollection", "features": features}
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f, indent=2)
+    write_geojson(features, OUTPUT_FILE)
 
     file_size = round(os.path.getsize(OUTPUT_FILE) / 1024, 1)
 
@@ -989,79 +1107,109 @@ def main():
     for s in top:
         type_counts[s["opportunity_type"]] = type_counts.get(s["opportunity_type"], 0) + 1
 
-    print()
-    print("=" * 120)
-    print("TOP 20 OPPORTUNITY SITES")
-    print("=" * 120)
     header = "{:>3}  {:<32} {:>2}  {:>6}  {:>15}  {:>5}  {:>5}  {:>5}  {:>5}  {:>6}  {:<20}".format(
         "#", "Site Name", "ST", "Score", "Type", "TTP", "SiteR", "Conn", "Risk", "SubMi", "Qualifying Sub"
     )
-    print(header)
-    print("-" * 120)
+    row_fmt = "{:>3}  {:<32} {:>2}  {:>6}  {:>15}  {:>5}  {:>5}  {:>5}  {:>5}  {:>6}  {:<20}"
+    type_labels = {"retired_plant": "Retired Plant", "adaptive_reuse": "Adaptive Reuse",
+                   "greenfield": "Greenfield"}
+    # Collect the report and write it with one print
+    rows = ["", "=" * 120, "TOP 20 OPPORTUNITY SITES", "=" * 120, header, "-" * 120]
     for i, s in enumerate(top[:20]):
-        name = s["plant_name"][:32]
-        type_label = {"retired_plant": "Retired Plant", "adaptive_reuse": "Adaptive Reuse",
-                       "greenfield": "Greenfield"}[s["opportunity_type"]]
-        print("{:>3}  {:<32} {:>2}  {:>6}  {:>15}  {:>5}  {:>5}  {:>5}  {:>5}  {:>6}  {:<20}".format(
-            i + 1, name, s["state"], s["composite_score"],
-            type_label, s["time_to_power"], s["site_readiness"],
+        rows.append(row_fmt.format(
+            i + 1, s["plant_name"][:32], s["state"], s["composite_score"],
+            type_labels[s["opportunity_type"]], s["time_to_power"], s["site_readiness"],
             s["connectivity"], s["risk_factors"],
             s["nearest_sub_distance_miles"],
             (s.get("qualifying_substation") or "")[:20],
         ))
 
-    print()
-    print("Output: {} ({} KB)".format(OUTPUT_FILE, file_size))
-    print("Total opportunities: {} (of {} raw sites scored)".format(len(top), len(scored)))
-    print("  Retired Plant:   {}".format(type_counts["retired_plant"]))
-    print("  Adaptive Reuse:  {}".format(type_counts["adaptive_reuse"]))
-    print("  Greenfield:      {}".format(type_counts["greenfield"]))
+    rows += [
+        "",
+        "Output: {} ({} KB)".format(OUTPUT_FILE, file_size),
+        "Total opportunities: {} (of {} raw sites scored)".format(len(top), len(scored)),
+        "  Retired Plant:   {}".format(type_counts["retired_plant"]),
+        "  Adaptive Reuse:  {}".format(type_counts["adaptive_reuse"]),
+        "  Greenfield:      {}".format(type_counts["greenfield"]),
+    ]
+    print("\n".join(rows))
+
+
+def iter_rings(coords):
+    """Yield the innermost [[lon,lat], ...] point lists of GeoJSON coordinates."""
+    if not coords:
+        return
+    if isinstance(coords[0][0], (list, tuple)):
+        for c in coords:
+            yield from iter_rings(c)
+    else:
+        yield coords
 
 
 def compute_bbox(geometry):
-    """Compute bounding box of a GeoJSON geometry."""
+    """Compute bounding box of a GeoJSON geometry.
+
+    Returns a packed (minlat, maxlat, minlon, maxlon) tuple.
+    """
     min_lat = 90
     max_lat = -90
     min_lon = 180
     max_lon = -180
 
-    def process_coords(coords):
-        nonlocal min_lat, max_lat, min_lon, max_lon
-        for c in coords:
-            if isinstance(c[0], (list, tuple)):
-                process_coords(c)
-            else:
-                lon, lat = c[0], c[1]
-                if lat < min_lat:
-                    min_lat = lat
-                if lat > max_lat:
-                    max_lat = lat
-                if lon < min_lon:
-                    min_lon = lon
-                if lon > max_lon:
-                    max_lon = lon
-
-    process_coords(geometry.get("coordinates", []))
-    return {"minlat": min_lat, "maxlat": max_lat, "minlon": min_lon, "maxlon": max_lon}
+    # Nesting is resolved once per ring, not with an isinstance check per point
+    for ring in iter_rings(geometry.get("coordinates", [])):
+        for c in ring:
+            lon, lat = c[0], c[1]
+            if lat < min_lat:
+                min_lat = lat
+            if lat > max_lat:
+                max_lat = lat
+            if lon < min_lon:
+                min_lon = lon
+            if lon > max_lon:
+                max_lon = lon
+
+    return (min_lat, max_lat, min_lon, max_lon)
 
 
 def cluster_substations(qualifying, radius_miles):
     """Cluster nearby qualifying substations to reduce Overpass queries."""
-    used = [False] * len(qualifying)
+    n = len(qualifying)
+    used = [False] * n
     clusters = []
 
+    # Trig terms are computed once per substation rather than once per pair.
+    # Haversine is monotonic in `a`, so pairs are compared against the `a`
+    # of the merge distance.
+    lat_r = [math.radians(s["lat"]) for s in qualifying]
+    lon_r = [math.radians(s["lon"]) for s in qualifying]
+    cos_lat = [math.cos(v) for v in lat_r]
+    max_angle = radius_miles * 2 / 3958.8
+    max_a = math.sin(max_angle / 2) ** 2
+
+    # Latitude-sorted index: only substations within max_angle of latitude
+    # can be in range, so each neighbor search is a bisect plus a short scan
+    # instead of a pass over every later substation.
+    by_lat = sorted(range(n), key=lat_r.__getitem__)
+    sorted_lat = [lat_r[k] for k in by_lat]
+    window = max_angle * (1 + 1e-9)
+
     for i, sub in enumerate(qualifying):
         if used[i]:
             continue
         cluster = {"subs": [sub], "lat": sub["lat"], "lon": sub["lon"]}
         used[i] = True
-
-        for j in range(i + 1, len(qualifying)):
-            if used[j]:
-                continue
-            d = haversine_miles(sub["lat"], sub["lon"],
-                                qualifying[j]["lat"], qualifying[j]["lon"])
-            if d <= radius_miles * 2:
+        lat_i = lat_r[i]
+        lon_i = lon_r[i]
+        cos_i = cos_lat[i]
+
+        lo = bisect.bisect_left(sorted_lat, lat_i - window)
+        hi = bisect.bisect_right(sorted_lat, lat_i + window)
+        # Members are added in input order, as the pairwise scan did
+        for j in sorted(j for j in by_lat[lo:hi] if j > i and not used[j]):
+            a = (math.sin((lat_r[j] - lat_i) / 2) ** 2 +
+                 cos_i * cos_lat[j] * math.sin((lon_r[j] - lon_i) / 2) ** 2)
+            if a <= max_a:
                 cluster["subs"].append(qualifying[j])
                 used[j] = True
 
@@ -0,0 +1,53 @@
+"""
+On-disk pickle caches keyed on input files, shared by the pipeline scripts.
+
+Caches live in data/.cache/, outside public/data so they are never deployed.
+A cache whose key no longer matches, or that cannot be read, is a miss.
+"""
+
+import os
+import pickle
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", ".cache")
+
+
+def cache_path(name):
+    """Path of a cache file in CACHE_DIR."""
+    return os.path.join(CACHE_DIR, name)
+
+
+def input_key(paths):
+    """Cache key for a list of input files: (name, mtime_ns, size) per file."""
+    key = []
+    for path in paths:
+        if os.path.exists(path):
+            st = os.stat(path)
+            key.append((os.path.basename(path), st.st_mtime_ns, st.st_size))
+        else:
+            key.append((os.path.basename(path), None, None))
+    return key
+
+
+def load_cache(path, key):
+    """Return the value cached at path if it was saved under key, else None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            cached = pickle.load(f)
+    except Exception as e:
+        print("  Cache {} unreadable, rebuilding: {}".format(os.path.basename(path), e))
+        return None
+    if cached.get("key") != key:
+        return None
+    return cached["value"]
+
+
+def save_cache(path, key, value):
+    """Save value under key at path. A failed write is reported, not raised."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump({"key": key, "value": value}, f, pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print("  Could not write cache {}: {}".format(os.path.basename(path), e))
@@ -0,0 +1,67 @@
+"""
+JSON reading and writing shared by the pipeline scripts.
+
+orjson is used when it is installed, else the stdlib json module. Both parse
+to the same Python objects.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def parse_json(data):
+    """Parse a JSON document from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_json(path):
+    """Parse a JSON file."""
+    with open(path, "rb") as f:
+        return parse_json(f.read())
+
+
+def compact_encoder():
+    """Return a function encoding one object to compact JSON bytes.
+
+    Uses orjson when it is installed, else the stdlib encoder with compact
+    separators.
+    """
+    if orjson is not None:
+        return orjson.dumps
+    json_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+    def encode(obj):
+        return json_encode(obj).encode("utf-8")
+    return encode
+
+
+def write_json(obj, output_path):
+    """Write a whole JSON document compactly, top-level members included."""
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(compact_encoder()(obj))
+        f.write(b"\n")
+
+
+def write_geojson(features, output_path):
+    """Write a FeatureCollection with compact separators, one feature per line.
+
+    Only "type" and "features" are written; use write_json() to keep any
+    other top-level members of a parsed document.
+    """
+    encode = compact_encoder()
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "wb", buffering=1 << 20) as f:
+        f.write(b'{"type":"FeatureCollection","features":[\n')
+        for i, feat in enumerate(features):
+            if i:
+                f.write(b",\n")
+            f.write(encode(feat))
+        f.write(b"\n]}\n")
@@ -11,10 +11,11 @@ Deduplicates by proximity (0.5 mile radius) — keeps the feature with more data
 Outputs: public/data/all-sites.geojson
 """
 
-import json
 import math
 import os
 
+from json_io import load_json, write_geojson
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(SCRIPT_DIR, "..", "public", "data")
 
@@ -36,7 +37,8 @@ def haversine_miles(lat1, lon1, lat2, lon2):
     a = (math.sin(dlat / 2) ** 2 +
          math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
          math.sin(dlon / 2) ** 2)
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    # asin(sqrt(a)) == atan2(sqrt(a), sqrt(1 - a)) for a in [0, 1], minus a sqrt
+    return R * 2 * math.asin(min(1.0, math.sqrt(a)))
 
 
 def feature_richness(feat):
@@ -70,8 +72,7 @@ def main():
             print("  SKIP {} — not found".format(filename))
             source_counts[label] = 0
             continue
-        with open(filepath) as f:
-            geo = json.load(f)
+        geo = load_json(filepath)
         features = geo.get("features", [])
         source_counts[label] = len(features)
         all_features.extend(features)
@@ -110,10 +111,7 @@ def main():
     print("  Total after dedup:  {}".format(len(kept)))
 
     # Write output
-    output = {"type": "FeatureCollection", "features": kept}
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(output, f, indent=2)
+    write_geojson(kept, OUTPUT_FILE)
 
     file_size = round(os.path.getsize(OUTPUT_FILE) / 1024, 1)
     print()
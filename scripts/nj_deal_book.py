@@ -20,7 +20,6 @@ Usage:
 
 import argparse
 import json
-import math
 import os
 import re
 import sqlite3
@@ -31,6 +30,9 @@ import urllib.parse
 import urllib.request
 from datetime import datetime, timedelta, timezone
 
+from json_io import load_json
+from spatial_index import build_nearest_index, haversine_miles, nearest_point
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.join(SCRIPT_DIR, "..")
 DATA_DIR = os.path.join(PROJECT_DIR, "public", "data")
@@ -141,16 +143,6 @@ def matches_industry(text):
 # ── Utilities ────────────────────────────────────────────────────────────────
 
 
-def haversine_miles(lat1, lon1, lat2, lon2):
-    R = 3958.8
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat / 2) ** 2 +
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-         math.sin(dlon / 2) ** 2)
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-
 def parse_date(date_str):
     if not date_str or not date_str.strip():
         return None
@@ -368,6 +360,7 @@ def geocode_cached(address, state=""):
 
 _substations_nj = None
 _all_substations = None
+_all_substation_index = None  # build_nearest_index() of _all_substations
 
 
 def load_nj_substations(min_kv=138):
@@ -379,8 +372,7 @@ def load_nj_substations(min_kv=138):
     if not os.path.exists(SUBSTATIONS_FILE):
         print("  WARNING: substations.geojson not found")
         return _substations_nj
-    with open(SUBSTATIONS_FILE) as f:
-        geo = json.load(f)
+    geo = load_json(SUBSTATIONS_FILE)
     for feat in geo["features"]:
         p = feat["properties"]
         v = p.get("MAX_VOLT")
@@ -400,14 +392,14 @@ def load_nj_substations(min_kv=138):
 
 def load_all_substations(min_kv=138):
     """Load all substations (for nearest-substation lookups)."""
-    global _all_substations
+    global _all_substations, _all_substation_index
     if _all_substations is not None:
         return _all_substations
     _all_substations = []
+    _all_substation_index = build_nearest_index(_all_substations)
     if not os.path.exists(SUBSTATIONS_FILE):
         return _all_substations
-    with open(SUBSTATIONS_FILE) as f:
-        geo = json.load(f)
+    geo = load_json(SUBSTATIONS_FILE)
     for feat in geo["features"]:
         p = feat["properties"]
         v = p.get("MAX_VOLT")
@@ -420,20 +412,16 @@ def load_all_substations(min_kv=138):
                 "name": p.get("NAME", ""),
                 "state": p.get("STATE", ""),
             })
+    _all_substation_index = build_nearest_index(_all_substations)
     return _all_substations
 
 
 def find_nearest_substation(lat, lon, min_kv=138):
     """Find nearest substation. Returns dict or None."""
-    subs = load_all_substations(min_kv)
-    best_dist = float("inf")
-    best = None
-    for s in subs:
-        d = haversine_miles(lat, lon, s["lat"], s["lon"])
-        if d < best_dist:
-            best_dist = d
-            best = s
-            best["distance_miles"] = round(d, 2)
+    load_all_substations(min_kv)
+    dist, best = nearest_point(lat, lon, _all_substation_index)
+    if best is not None:
+        best["distance_miles"] = round(dist, 2)
     return best
 
 
@@ -908,8 +896,7 @@ def run_part2(dry_run=False):
         print("  ERROR: power-plants.geojson not found")
         return []
 
-    with open(PLANTS_FILE) as f:
-        geo = json.load(f)
+    geo = load_json(PLANTS_FILE)
 
     # Filter NJ retired/retiring plants
     nj_plants = []
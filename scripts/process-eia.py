@@ -6,10 +6,14 @@ aggregates generators by plant, filters to >= 50 MW nameplate capacity,
 and writes a GeoJSON FeatureCollection.
 """
 
-import json
+import operator
 import os
+from collections import defaultdict
 import openpyxl
 
+from cell_labels import label_cleaner
+from json_io import write_geojson
+
 INPUT_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "december_generator2025.xlsx")
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "..", "public", "data", "power-plants.geojson")
 
@@ -49,8 +53,18 @@ COLUMNS = {
 HEADER_ROWS = 3  # title row, blank row, column names
 
 
+def clean_str(val):
+    """Convert a cell to a stripped string, with empty cells as ""."""
+    return str(val or "").strip()
+
+
 def safe_float(val):
     """Convert a value to float, returning None if not possible."""
+    # Numeric cells are the common case; skip the str() round-trip for them
+    if type(val) is float:
+        return val
+    if type(val) is int:
+        return float(val)
     if val is None or str(val).strip() == "":
         return None
     try:
@@ -81,24 +95,43 @@ def format_retirement_date(month, year):
 def read_sheet(wb, sheet_name, sheet_type):
     """
     Read a sheet and return a dict of plants keyed by plant_id.
-    Each plant accumulates: total_mw, generators list (for fuel tracking),
-    and metadata from the first generator encountered.
+    Each plant accumulates: total_mw, MW per fuel and per entity (for the
+    dominant fuel/owner), and metadata from the first generator encountered.
     """
     ws = wb[sheet_name]
     cols = COLUMNS[sheet_type]
     plants = {}
 
-    for row_idx, row in enumerate(ws.iter_rows(values_only=True)):
-        if row_idx < HEADER_ROWS:
-            continue
-
-        plant_id = row[cols["plant_id"]]
+    # Bind column indices once so each row access is a plain tuple index
+    plant_id_i = cols["plant_id"]
+    plant_name_i = cols["plant_name"]
+    mw_i = cols["nameplate_mw"]
+    entity_id_i = cols["entity_id"]
+    entity_name_i = cols["entity_name"]
+    lat_i = cols["latitude"]
+    lng_i = cols["longitude"]
+    is_operating = sheet_type == "Operating"
+    if is_operating:
+        ret_month_i = cols["planned_retirement_month"]
+        ret_year_i = cols["planned_retirement_year"]
+    else:
+        ret_month_i = cols["retirement_month"]
+        ret_year_i = cols["retirement_year"]
+
+    # State and fuel columns repeat a few dozen values across every row, so
+    # clean each distinct cell once and share the resulting string
+    label_cells = operator.itemgetter(
+        cols["state"], cols["technology"], cols["energy_source"])
+    label = label_cleaner(clean_str)
+
+    for row in ws.iter_rows(min_row=HEADER_ROWS + 1, values_only=True):
+        plant_id = row[plant_id_i]
         if plant_id is None:
             continue
 
-        lat = safe_float(row[cols["latitude"]])
-        lng = safe_float(row[cols["longitude"]])
-        mw = safe_float(row[cols["nameplate_mw"]])
+        lat = safe_float(row[lat_i])
+        lng = safe_float(row[lng_i])
+        mw = safe_float(row[mw_i])
 
         # Skip rows with missing coordinates or capacity
         if lat is None or lng is None:
@@ -106,24 +139,16 @@ def read_sheet(wb, sheet_name, sheet_type):
         if mw is None:
             mw = 0.0
 
-        plant_name = str(row[cols["plant_name"]] or "").strip()
-        state = str(row[cols["state"]] or "").strip()
-        technology = str(row[cols["technology"]] or "").strip()
-        energy_source = str(row[cols["energy_source"]] or "").strip()
-        entity_id = safe_int(row[cols["entity_id"]])
-        entity_name = str(row[cols["entity_name"]] or "").strip()
+        plant_name = str(row[plant_name_i] or "").strip()
+        state, technology, energy_source = map(label, label_cells(row))
+        entity_id = safe_int(row[entity_id_i])
+        entity_name = str(row[entity_name_i] or "").strip()
 
         # Determine status and planned retirement
-        planned_retirement = None
-        if sheet_type == "Operating":
-            ret_month = row[cols["planned_retirement_month"]]
-            ret_year = row[cols["planned_retirement_year"]]
-            planned_retirement = format_retirement_date(ret_month, ret_year)
+        planned_retirement = format_retirement_date(row[ret_month_i], row[ret_year_i])
+        if is_operating:
             status = "retiring" if planned_retirement else "operating"
         else:
-            ret_month = row[cols["retirement_month"]]
-            ret_year = row[cols["retirement_year"]]
-            planned_retirement = format_retirement_date(ret_month, ret_year)
             status = "retired"
 
         # Use a composite key: plant_id + sheet_type to keep operating and
@@ -140,23 +165,19 @@ def read_sheet(wb, sheet_name, sheet_type):
                 "total_mw": 0.0,
                 "status": status,
                 "planned_retirement_date": planned_retirement,
-                "generators": [],
-                "entities": {},  # entity_id -> {name, mw}
+                "fuel_mw": defaultdict(float),    # technology -> mw
+                "entity_mw": defaultdict(float),  # entity_id -> mw
+                "entity_names": {},               # entity_id -> name
             }
 
         plant = plants[key]
         plant["total_mw"] += mw
-        plant["generators"].append({
-            "mw": mw,
-            "technology": technology,
-            "energy_source": energy_source,
-        })
+        plant["fuel_mw"][technology or energy_source] += mw
 
         # Track entity MW to find dominant owner/operator
         if entity_id is not None:
-            if entity_id not in plant["entities"]:
-                plant["entities"][entity_id] = {"name": entity_name, "mw": 0.0}
-            plant["entities"][entity_id]["mw"] += mw
+            plant["entity_mw"][entity_id] += mw
+            plant["entity_names"].setdefault(entity_id, entity_name)
 
         # If any generator on an operating plant has a retirement date,
         # flag the whole plant as retiring
@@ -168,28 +189,25 @@ def read_sheet(wb, sheet_name, sheet_type):
     return plants
 
 
-def dominant_fuel(generators):
-    """Return the technology of the generator(s) contributing the most MW."""
-    fuel_mw = {}
-    for g in generators:
-        tech = g["technology"] or g["energy_source"]
-        fuel_mw[tech] = fuel_mw.get(tech, 0.0) + g["mw"]
+def dominant_fuel(fuel_mw):
+    """Return the technology contributing the most MW."""
     if not fuel_mw:
         return "Unknown"
     return max(fuel_mw, key=fuel_mw.get)
 
 
-def dominant_entity(entities):
+def dominant_entity(entity_mw, entity_names):
     """Return (entity_id, entity_name) of the entity contributing the most MW."""
-    if not entities:
+    if not entity_mw:
         return None, ""
-    best_id = max(entities, key=lambda eid: entities[eid]["mw"])
-    return best_id, entities[best_id]["name"]
+    best_id = max(entity_mw, key=entity_mw.get)
+    return best_id, entity_names[best_id]
 
 
 def main():
     print("Reading " + INPUT_FILE)
-    wb = openpyxl.load_workbook(INPUT_FILE, read_only=True)
+    wb = openpyxl.load_workbook(INPUT_FILE, read_only=True, data_only=True,
+                                keep_links=False)
 
     all_plants = {}
 
@@ -234,7 +252,7 @@ def main():
             skipped += 1
             continue
 
-        eid, ename = dominant_entity(plant["entities"])
+        eid, ename = dominant_entity(plant["entity_mw"], plant["entity_names"])
 
         props = {
             "plant_name": plant["plant_name"],
@@ -242,7 +260,7 @@ def main():
             "latitude": plant["latitude"],
             "longitude": plant["longitude"],
             "total_capacity_mw": total,
-            "fuel_type": dominant_fuel(plant["generators"]),
+            "fuel_type": dominant_fuel(plant["fuel_mw"]),
             "status": plant["status"],
             "owner_name": ename,
             "utility_id": eid,
@@ -260,14 +278,7 @@ def main():
         }
         features.append(feature)
 
-    geojson = {
-        "type": "FeatureCollection",
-        "features": features,
-    }
-
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f, indent=2)
+    write_geojson(features, OUTPUT_FILE)
 
     print("")
     print("Done!")
@@ -9,22 +9,34 @@ Source: LBNL Interconnection Queue Data (thru 2024)
 Geocoding: Census Bureau 2020 county population centroids
 """
 
-import json
+import csv
+import datetime
+import functools
+import io
 import math
 import os
+import time
 import urllib.request
 import openpyxl
 
+from cell_labels import label_cleaner
+from json_io import write_geojson
+
 SCRIPT_DIR = os.path.dirname(__file__)
 INPUT_FILE = os.path.join(SCRIPT_DIR, "..", "data", "LBNL_Ix_Queue_Data_File_thru2024_v2.xlsx")
 OUTPUT_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "queue-withdrawals.geojson")
 
 CENSUS_URL = "https://www2.census.gov/geo/docs/reference/cenpop2020/county/CenPop2020_Mean_CO.txt"
+CENSUS_CACHE_FILE = os.path.join(SCRIPT_DIR, "..", "data", "CenPop2020_Mean_CO.txt")
+CENSUS_CACHE_DAYS = 30
 
 SHEET_NAME = "03. Complete Queue Data"
 HEADER_ROW = 1  # row index of column names (0-based)
 MIN_MW = 50
 
+# Excel epoch: 1900-01-01 = 1 (with the 1900 leap year bug)
+EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+
 # Column indices (0-based)
 COL_QID = 0
 COL_STATUS = 1
@@ -44,6 +56,11 @@ COL_TYPE_CLEAN = 28
 
 
 def safe_float(val):
+    # Numeric cells are the common case; skip the str() round-trip for them
+    if type(val) is float:
+        return val
+    if type(val) is int:
+        return float(val)
     if val is None or str(val).strip() in ("", "NA"):
         return 0.0
     try:
@@ -53,9 +70,10 @@ def safe_float(val):
 
 
 def safe_str(val):
-    if val is None or str(val).strip() == "NA":
+    if val is None:
         return ""
-    return str(val).strip()
+    s = (val if type(val) is str else str(val)).strip()
+    return "" if s == "NA" else s
 
 
 def excel_date_to_str(val):
@@ -68,36 +86,53 @@ def excel_date_to_str(val):
         return None
     if serial < 1:
         return None
-    # Excel epoch: 1900-01-01 = 1 (with the 1900 leap year bug)
-    import datetime
+    return excel_serial_to_str(serial)
+
+
+@functools.lru_cache(maxsize=None)
+def excel_serial_to_str(serial):
+    """Format a day serial; queue and withdrawal dates repeat across rows,
+    so each distinct day is converted once."""
     try:
-        dt = datetime.datetime(1899, 12, 30) + datetime.timedelta(days=serial)
+        dt = EXCEL_EPOCH + datetime.timedelta(days=serial)
         return dt.strftime("%Y-%m-%d")
     except (ValueError, OverflowError):
         return None
 
 
 def fetch_county_centroids():
-    """Download Census 2020 county centroids, return dict of FIPS -> (lat, lon)."""
-    print("  Downloading Census county centroids...")
-    req = urllib.request.Request(CENSUS_URL, headers={"User-Agent": "GridSite/1.0"})
-    with urllib.request.urlopen(req, timeout=60) as resp:
-        raw = resp.read()
-    text = raw.decode("utf-8-sig")
-    lines = text.strip().split("\n")
+    """Load Census 2020 county centroids, return dict of FIPS -> (lat, lon).
+
+    The file is downloaded once and cached under data/, and only re-fetched
+    when the cached copy is older than CENSUS_CACHE_DAYS.
+    """
+    cache_fresh = (
+        os.path.exists(CENSUS_CACHE_FILE) and
+        time.time() - os.path.getmtime(CENSUS_CACHE_FILE) < CENSUS_CACHE_DAYS * 86400
+    )
+    if cache_fresh:
+        print("  Reading cached Census county centroids...")
+        with open(CENSUS_CACHE_FILE, "rb") as f:
+            raw = f.read()
+    else:
+        print("  Downloading Census county centroids...")
+        req = urllib.request.Request(CENSUS_URL, headers={"User-Agent": "GridSite/1.0"})
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            raw = resp.read()
+        os.makedirs(os.path.dirname(CENSUS_CACHE_FILE), exist_ok=True)
+        with open(CENSUS_CACHE_FILE, "wb") as f:
+            f.write(raw)
+
+    reader = csv.reader(io.StringIO(raw.decode("utf-8-sig")))
+    next(reader, None)  # header
 
     centroids = {}
-    for line in lines[1:]:
-        parts = line.split(",")
+    for parts in reader:
         if len(parts) < 7:
             continue
-        state_fp = parts[0].strip()
-        county_fp = parts[1].strip()
-        lat = parts[5].strip()
-        lon = parts[6].strip()
         try:
-            fips = int(state_fp + county_fp)
-            centroids[fips] = (float(lat), float(lon))
+            fips = int(parts[0].strip() + parts[1].strip())
+            centroids[fips] = (float(parts[5]), float(parts[6]))
         except ValueError:
             continue
 
@@ -110,7 +145,8 @@ def main():
     centroids = fetch_county_centroids()
 
     print("  Reading " + INPUT_FILE)
-    wb = openpyxl.load_workbook(INPUT_FILE, read_only=True)
+    wb = openpyxl.load_workbook(INPUT_FILE, read_only=True, data_only=True,
+                                keep_links=False)
     ws = wb[SHEET_NAME]
 
     features = []
@@ -119,11 +155,13 @@ def main():
     total_withdrawn = 0
     region_counts = {}
 
-    for i, row in enumerate(ws.iter_rows(values_only=True)):
-        if i <= HEADER_ROW:
-            continue
+    # Status, state, fuel and region hold a handful of distinct values, so
+    # clean each one once and share the string across features
+    label = label_cleaner(safe_str)
 
-        status = safe_str(row[COL_STATUS])
+    # iter_rows is 1-based; start on the first data row after the header
+    for row in ws.iter_rows(min_row=HEADER_ROW + 2, values_only=True):
+        status = label(row[COL_STATUS])
         if status != "withdrawn":
             continue
         total_withdrawn += 1
@@ -137,30 +175,33 @@ def main():
             continue
 
         fips_raw = row[COL_FIPS]
-        if fips_raw is None or str(fips_raw).strip() in ("", "NA"):
-            skipped_no_fips += 1
-            continue
-
-        try:
-            fips = int(float(str(fips_raw).strip()))
-        except (ValueError, TypeError):
-            skipped_no_fips += 1
-            continue
-
-        if fips not in centroids:
+        if type(fips_raw) is int:
+            fips = fips_raw
+        else:
+            if fips_raw is None or str(fips_raw).strip() in ("", "NA"):
+                skipped_no_fips += 1
+                continue
+            try:
+                fips = int(float(str(fips_raw).strip()))
+            except (ValueError, TypeError):
+                skipped_no_fips += 1
+                continue
+
+        centroid = centroids.get(fips)
+        if centroid is None:
             skipped_no_centroid += 1
             continue
 
-        lat, lon = centroids[fips]
+        lat, lon = centroid
 
         q_id = safe_str(row[COL_QID])
         project_name = safe_str(row[COL_PROJECT])
-        state = safe_str(row[COL_STATE])
+        state = label(row[COL_STATE])
         county = safe_str(row[COL_COUNTY])
         poi_name = safe_str(row[COL_POI])
         entity = safe_str(row[COL_ENTITY])
-        fuel_type = safe_str(row[COL_TYPE_CLEAN])
-        region = safe_str(row[COL_REGION])
+        fuel_type = label(row[COL_TYPE_CLEAN])
+        region = label(row[COL_REGION])
         q_date = excel_date_to_str(row[COL_QDATE])
         wd_date = excel_date_to_str(row[COL_WDDATE])
 
@@ -191,11 +232,7 @@ def main():
 
     wb.close()
 
-    geojson = {"type": "FeatureCollection", "features": features}
-
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f, indent=2)
+    write_geojson(features, OUTPUT_FILE)
 
     file_size = round(os.path.getsize(OUTPUT_FILE) / 1024 / 1024, 1)
 
@@ -15,9 +15,18 @@ Scoring model (4 dimensions, weighted):
   Risk Factors     (15%) - contamination/environmental risk, operational status, flood zone exposure
 """
 
-import json
+import concurrent.futures
+import functools
+import heapq
 import math
 import os
+import sys
+
+from input_cache import cache_path, input_key, load_cache, save_cache
+from json_io import load_json, write_geojson
+from spatial_index import (
+    build_nearest_index, build_range_index, haversine_terms, nearest_point, points_within,
+)
 
 SCRIPT_DIR = os.path.dirname(__file__)
 PLANTS_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "power-plants.geojson")
@@ -30,9 +39,26 @@ AVAILABILITY_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "availabili
 WARN_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "warn-closures.geojson")
 NEWS_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "industrial-closures.geojson")
 OUTPUT_FILE = os.path.join(SCRIPT_DIR, "..", "public", "data", "scored-sites.geojson")
+CACHE_FILE = cache_path("score-sites.pickle")
+CACHE_INPUTS = [
+    PLANTS_FILE, SUBSTATIONS_FILE, QUEUE_FILE, BROWNFIELDS_FILE, LMP_FILE,
+    ATC_FILE, WARN_FILE, NEWS_FILE, os.path.abspath(__file__),
+    os.path.join(SCRIPT_DIR, "spatial_index.py"),
+]
+# Per-site spatial lookups, keyed on the point datasets only, so edits to the
+# scoring model reuse them. Bump SPATIAL_CACHE_VERSION when locate_candidate()
+# or the point indexes change what they return.
+SPATIAL_CACHE_FILE = cache_path("score-sites.spatial.pickle")
+SPATIAL_CACHE_INPUTS = [SUBSTATIONS_FILE, QUEUE_FILE, LMP_FILE, ATC_FILE]
+SPATIAL_CACHE_VERSION = 1
+NO_CACHE = "--no-cache" in sys.argv
 
 MIN_SCORE = 60       # Minimum score for any site type
 MAX_BROWNFIELDS = 100  # Cap brownfields to keep output size manageable
+SCORING_CHUNK = 2500  # candidates per worker task
+QW_RADIUS_MILES = 20
+# Haversine `a` term at QW_RADIUS_MILES; a <= this is the same test as d <= 20
+QW_RADIUS_A = math.sin(QW_RADIUS_MILES / 3958.8 / 2) ** 2
 
 # FEMA high-risk flood zone states/regions
 FLOOD_RISK_STATES = {
@@ -101,20 +127,21 @@ CONTAMINATION_SCORES = {
     "All Other": 60,
 }
 
+# Fuel types as small integer codes resolved once at load time, so the
+# per-site scorers index tuples instead of hashing fuel names. The last slot
+# holds the default for fuels missing from the tables.
+FUEL_IDS = {name: i for i, name in enumerate(FUEL_TYPE_SCORES)}
+UNKNOWN_FUEL_ID = len(FUEL_IDS)
+FUEL_SCORE_BY_ID = tuple(FUEL_TYPE_SCORES.values()) + (50,)
+CONTAMINATION_SCORE_BY_ID = tuple(
+    CONTAMINATION_SCORES.get(name, 60) for name in FUEL_IDS) + (60,)
 
-def haversine_miles(lat1, lon1, lat2, lon2):
-    """Great-circle distance between two points in miles."""
-    R = 3958.8
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat / 2) ** 2 +
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-         math.sin(dlon / 2) ** 2)
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-
-def clamp(val, lo=0.0, hi=100.0):
-    return max(lo, min(hi, val))
+# Stranded capacity contamination by industry keyword, first match wins
+INDUSTRIAL_CONTAMINATION_SCORES = (
+    (("chemical", "refinery", "smelter"), 50),
+    (("foundry", "steel", "paper"), 60),
+    (("warehouse", "distribution", "fulfillment", "assembly"), 80),
+)
 
 
 def is_coastal_location(lat, lon, state):
@@ -143,7 +170,8 @@ def is_coastal_location(lat, lon, state):
 
 def compute_sub_distance(dist):
     """Distance to nearest 345kV+ sub: 100 at 0 mi, 0 at 50+ mi."""
-    return clamp(100 - dist * 2)
+    # dist >= 0, so only the floor can bind
+    return max(0.0, 100 - dist * 2)
 
 
 def compute_sub_voltage(max_volt):
@@ -159,37 +187,43 @@ def compute_sub_voltage(max_volt):
 
 def compute_gen_capacity(capacity):
     """Existing generation capacity score (power plants only)."""
-    return clamp((capacity - 50) / 1950 * 100)
+    score = (capacity - 50) / 1950 * 100
+    return 0.0 if score <= 0 else 100.0 if score >= 100 else score
 
 
 def compute_tx_lines(lines):
     """Connected transmission lines score."""
-    return clamp(lines / 8 * 100)
+    # Line counts are never negative, so only the ceiling can bind
+    return min(100.0, lines / 8 * 100)
 
 
 def compute_queue_withdrawal(qw_count, qw_mw):
     """Queue withdrawal activity score."""
     if qw_count == 0:
         return 30
-    count_score = clamp(30 + qw_count * 5, 30, 100)
-    mw_bonus = clamp(qw_mw / 5000 * 20, 0, 20)
-    return clamp(count_score + mw_bonus)
+    # qw_count >= 1 and mw_bonus >= 0 here, so only the ceilings can bind
+    count_score = min(100, 30 + qw_count * 5)
+    mw_bonus = qw_mw / 5000 * 20
+    mw_bonus = 0 if mw_bonus <= 0 else 20 if mw_bonus >= 20 else mw_bonus
+    return min(100.0, count_score + mw_bonus)
 
 
-def compute_fuel_type(fuel):
-    """Fuel type suitability score (power plants only)."""
-    return FUEL_TYPE_SCORES.get(fuel, 50)
+def compute_fuel_type(fuel_id):
+    """Fuel type suitability score (power plants only), by FUEL_IDS code."""
+    return FUEL_SCORE_BY_ID[fuel_id]
 
 
 def compute_capacity_scale(capacity):
     """Capacity scale score (power plants only)."""
-    return clamp((capacity - 50) / 1450 * 100)
+    score = (capacity - 50) / 1450 * 100
+    return 0.0 if score <= 0 else 100.0 if score >= 100 else score
 
 
 def compute_longitude(lon):
     """Longitude proximity proxy."""
     if lon < -70:
-        return clamp(100 - (lon + 70) * -1.2)
+        # (lon + 70) * -1.2 > 0 west of -70, so only the floor can bind
+        return max(0.0, 100 - (lon + 70) * -1.2)
     return 100
 
 
@@ -202,9 +236,8 @@ def compute_latitude(lat):
     return 40
 
 
-def compute_broadband(state):
-    """Broadband coverage score from state-level FCC data."""
-    bb_pct = BROADBAND_COVERAGE.get(state, 80)
+def compute_broadband_tier(bb_pct):
+    """Broadband score for a % of locations with 100/20+ Mbps coverage."""
     if bb_pct >= 95:
         return 95
     elif bb_pct >= 90:
@@ -218,23 +251,33 @@ def compute_broadband(state):
     return 35
 
 
+# Broadband depends only on the state, so every state's tier is resolved once
+BROADBAND_SCORE_BY_STATE = {
+    state: compute_broadband_tier(pct) for state, pct in BROADBAND_COVERAGE.items()
+}
+UNKNOWN_BROADBAND_SCORE = compute_broadband_tier(80)
+
+
 def compute_contamination(site):
     """Contamination risk score."""
     if site["site_type"] == "power_plant":
-        return CONTAMINATION_SCORES.get(site["fuel_type"], 60)
+        return CONTAMINATION_SCORE_BY_ID[site["fuel_id"]]
     if site["site_type"] == "stranded_capacity":
-        # Industrial sites vary — chemical/refinery lower, warehouse/assembly higher
-        sub_type = site.get("sub_type", "").lower()
-        if any(k in sub_type for k in ["chemical", "refinery", "smelter"]):
-            return 50
-        if any(k in sub_type for k in ["foundry", "steel", "paper"]):
-            return 60
-        if any(k in sub_type for k in ["warehouse", "distribution", "fulfillment", "assembly"]):
-            return 80
-        return 65  # generic industrial
+        return compute_industrial_contamination(site.get("sub_type", ""))
     return 55  # brownfield
 
 
+@functools.lru_cache(maxsize=None)
+def compute_industrial_contamination(sub_type):
+    """Contamination score for a stranded capacity site's industry sub-type.
+    Industrial sites vary — chemical/refinery lower, warehouse/assembly higher."""
+    sub_type = sub_type.lower()
+    for keywords, score in INDUSTRIAL_CONTAMINATION_SCORES:
+        if any(k in sub_type for k in keywords):
+            return score
+    return 65  # generic industrial
+
+
 def compute_operational_status(site):
     """Operational status score (power plants only)."""
     if site["site_type"] == "power_plant":
@@ -244,13 +287,14 @@ def compute_operational_status(site):
 
 def compute_flood_zone(lat, lon, state):
     """Flood zone exposure score."""
-    if is_coastal_location(lat, lon, state):
-        return 35
-    elif state in MODERATE_FLOOD_STATES:
-        return 65
-    return 90
+    # Outside the Gulf/Atlantic risk states the score depends on the state
+    # alone, so only those states go through the coordinate heuristic
+    if state not in FLOOD_RISK_STATES:
+        return 65 if state in MODERATE_FLOOD_STATES else 90
+    return 35 if is_coastal_location(lat, lon, state) else 90
 
 
+@functools.lru_cache(maxsize=None)
 def compute_lmp_score(avg_lmp):
     """LMP pricing score. Low LMP = grid headroom = high score."""
     if avg_lmp <= 20:
@@ -272,20 +316,14 @@ def compute_lmp_score(avg_lmp):
     return 20
 
 
-def find_nearest_lmp(lat, lon, lmp_nodes):
-    """Find nearest LMP pricing node and return (name, avg_lmp, lmp_score)."""
-    best_dist = float("inf")
-    best_node = None
-    for node in lmp_nodes:
-        d = haversine_miles(lat, lon, node["lat"], node["lon"])
-        if d < best_dist:
-            best_dist = d
-            best_node = node
-    if best_node is None:
+def lmp_terms(node):
+    """Return (name, avg_lmp, lmp_score) for the nearest LMP node, or defaults."""
+    if node is None:
         return "", 0, 50
-    return best_node["name"], best_node["avg_lmp"], compute_lmp_score(best_node["avg_lmp"])
+    return node["name"], node["avg_lmp"], compute_lmp_score(node["avg_lmp"])
 
 
+@functools.lru_cache(maxsize=None)
 def compute_atc_score(avg_atc_mw):
     """ATC scoring. High ATC = more transfer capability = high score."""
     if avg_atc_mw >= 3000:
@@ -303,35 +341,27 @@ def compute_atc_score(avg_atc_mw):
     return 20
 
 
-def find_nearest_atc(lat, lon, atc_nodes):
-    """Find nearest ATC interface and return (name, avg_atc_mw, atc_score)."""
-    best_dist = float("inf")
-    best_node = None
-    for node in atc_nodes:
-        d = haversine_miles(lat, lon, node["lat"], node["lon"])
-        if d < best_dist:
-            best_dist = d
-            best_node = node
-    if best_node is None:
+def atc_terms(node):
+    """Return (name, avg_atc_mw, atc_score) for the nearest ATC interface, or defaults."""
+    if node is None:
         return "", 0, 50
-    return best_node["name"], best_node["avg_atc_mw"], compute_atc_score(best_node["avg_atc_mw"])
+    return node["name"], node["avg_atc_mw"], compute_atc_score(node["avg_atc_mw"])
 
 
 # ── Dimension scorers ─────────────────────────────────────────────────────
 
 
-def score_time_to_power(site, nearest, nearby_withdrawals, lmp_score, atc_score=50):
+def score_time_to_power(site, sub_distance, sub_volt, sub_lines, qw_count, qw_mw,
+                        lmp_score, atc_score=50):
     """
     50% weight. Combines old Power Access + Grid Capacity + LMP pricing + ATC.
     Power plants: distance + gen capacity + voltage + tx lines + queue withdrawals + lmp + atc
     Brownfields: distance + voltage + tx lines + queue withdrawals + lmp + atc (no gen capacity)
     """
-    dist_score = compute_sub_distance(nearest["distance_miles"])
-    volt_score = compute_sub_voltage(nearest["max_volt"])
-    lines_score = compute_tx_lines(nearest.get("lines") or 0)
-    qw_score = compute_queue_withdrawal(
-        nearby_withdrawals["count"], nearby_withdrawals["total_mw"]
-    )
+    dist_score = compute_sub_distance(sub_distance)
+    volt_score = compute_sub_voltage(sub_volt)
+    lines_score = compute_tx_lines(sub_lines or 0)
+    qw_score = compute_queue_withdrawal(qw_count, qw_mw)
 
     if site["site_type"] == "power_plant":
         capacity = site.get("total_capacity_mw", 0)
@@ -354,7 +384,7 @@ def score_site_readiness(site):
     Brownfields: base reuse score (flat 65)
     """
     if site["site_type"] == "power_plant":
-        fuel_score = compute_fuel_type(site["fuel_type"])
+        fuel_score = compute_fuel_type(site["fuel_id"])
         capacity = site.get("total_capacity_mw", 0)
         scale_score = compute_capacity_scale(capacity)
         dim = fuel_score * 0.60 + scale_score * 0.40
@@ -372,7 +402,7 @@ def score_connectivity(site):
     """
     lon_score = compute_longitude(site["longitude"])
     lat_score = compute_latitude(site["latitude"])
-    bb_score = compute_broadband(site["state"])
+    bb_score = BROADBAND_SCORE_BY_STATE.get(site["state"], UNKNOWN_BROADBAND_SCORE)
     dim = lon_score * 0.40 + lat_score * 0.30 + bb_score * 0.30
     return dim, lon_score, lat_score, bb_score
 
@@ -453,36 +483,161 @@ def score_economic_motivation(site):
     return dim, emp_score, recency_score, mw_score
 
 
-# ── Main ──────────────────────────────────────────────────────────────────
+# ── Scoring pass ──────────────────────────────────────────────────────────
 
 
-def main():
-    # Load old scored sites for comparison
-    old_top10 = []
-    if os.path.exists(OUTPUT_FILE):
-        with open(OUTPUT_FILE) as f:
-            old_geojson = json.load(f)
-        for feat in old_geojson["features"][:10]:
-            p = feat["properties"]
-            old_top10.append({
-                "plant_name": p["plant_name"],
-                "state": p["state"],
-                "composite_score": p["composite_score"],
-            })
+def locate_candidate(lat, lon, sub_index, qw_index, lmp_index, atc_index):
+    """Run the spatial lookups for one site location.
 
-    print("Loading data...")
-    with open(PLANTS_FILE) as f:
-        plants_geojson = json.load(f)
-    with open(SUBSTATIONS_FILE) as f:
-        subs_geojson = json.load(f)
-    with open(QUEUE_FILE) as f:
-        queue_geojson = json.load(f)
+    Returns (sub_distance_miles, sub, qw_count, qw_total_mw, lmp_node,
+    atc_node), where the point entries are None when their index is empty.
+    qw_index comes from build_range_index(); the others from
+    build_nearest_index(). The result depends only on the location and the
+    point datasets, which is what lets SPATIAL_CACHE_FILE reuse it.
+    """
+    # The site's trig terms are shared by the three nearest lookups
+    terms = haversine_terms(lat, lon)
+
+    # Find nearest 345kV+ substation
+    best_dist, best_sub = nearest_point(lat, lon, sub_index, terms)
+
+    # Count queue withdrawals within 20 miles
+    nearby = points_within(lat, lon, QW_RADIUS_MILES, QW_RADIUS_A, qw_index)
+    qw_total_mw = 0.0
+    for qw in nearby:
+        qw_total_mw += qw["total_mw"]
+
+    # Find nearest LMP node and ATC interface
+    _, lmp_node = nearest_point(lat, lon, lmp_index, terms)
+    _, atc_node = nearest_point(lat, lon, atc_index, terms)
+
+    return best_dist, best_sub, len(nearby), qw_total_mw, lmp_node, atc_node
+
+
+def score_candidate(site, located):
+    """Score one candidate site and return its output properties dict.
+
+    located is the locate_candidate() result for the site's coordinates.
+    """
+    lat = site["latitude"]
+    lon = site["longitude"]
+    best_dist, best_sub, qw_count, qw_total_mw, lmp_node, atc_node = located
+
+    # The sub-scores take plain values rather than per-site wrapper dicts
+    if best_sub:
+        sub_volt, sub_lines, sub_name = best_sub["max_volt"], best_sub["lines"], best_sub["name"]
+    else:
+        sub_volt, sub_lines, sub_name = 345, 0, ""
+    lmp_name, lmp_avg, lmp_s = lmp_terms(lmp_node)
+    atc_name, atc_mw, atc_s = atc_terms(atc_node)
+
+    # Score each dimension
+    ttp, dist_s, volt_s, gen_s, lines_s, qw_s = score_time_to_power(
+        site, best_dist, sub_volt, sub_lines, qw_count, qw_total_mw, lmp_s, atc_s)
+    sr, fuel_s, scale_s = score_site_readiness(site)
+    co, lon_s, lat_s, bb_s = score_connectivity(site)
+    rf, contam_s, status_s, flood_s = score_risk_factors(site)
+    em, emp_s, recency_s, mw_s = score_economic_motivation(site)
+
+    # Reweight composite when economic motivation is active
+    if em > 0:
+        composite = (ttp * 0.40) + (em * 0.15) + (sr * 0.15) + (co * 0.15) + (rf * 0.15)
+    else:
+        composite = (ttp * 0.50) + (sr * 0.20) + (co * 0.15) + (rf * 0.15)
+    composite = round(0.0 if composite <= 0 else 100.0 if composite >= 100 else composite, 1)
+
+    return {
+        "plant_name": site["plant_name"],
+        "state": site["state"],
+        "latitude": lat,
+        "longitude": lon,
+        "total_capacity_mw": site.get("total_capacity_mw", 0),
+        "fuel_type": site.get("fuel_type", "Brownfield"),
+        "status": site.get("status", "brownfield"),
+        "planned_retirement_date": site.get("planned_retirement_date"),
+        "composite_score": composite,
+        "time_to_power": round(ttp, 1),
+        "site_readiness": round(sr, 1),
+        "connectivity": round(co, 1),
+        "risk_factors": round(rf, 1),
+        "sub_distance_score": round(dist_s, 1),
+        "sub_voltage_score": round(volt_s, 1),
+        "gen_capacity_score": round(gen_s, 1),
+        "tx_lines_score": round(lines_s, 1),
+        "queue_withdrawal_score": round(qw_s, 1),
+        "fuel_type_score": round(fuel_s, 1),
+        "capacity_scale_score": round(scale_s, 1),
+        "longitude_score": round(lon_s, 1),
+        "latitude_score": round(lat_s, 1),
+        "broadband_score": round(bb_s, 1),
+        "contamination_score": round(contam_s, 1),
+        "operational_status_score": round(status_s, 1),
+        "flood_zone_score": round(flood_s, 1),
+        "lmp_score": round(lmp_s, 1),
+        "nearest_lmp_avg": round(lmp_avg, 1),
+        "nearest_lmp_node": lmp_name,
+        "atc_score": round(atc_s, 1),
+        "nearest_atc_mw": round(atc_mw, 1),
+        "nearest_atc_interface": atc_name,
+        "nearest_sub_name": sub_name,
+        "nearest_sub_distance_miles": round(best_dist, 1),
+        "nearest_sub_voltage_kv": sub_volt,
+        "nearest_sub_lines": sub_lines,
+        "queue_count_20mi": qw_count,
+        "queue_mw_20mi": round(qw_total_mw, 1),
+        "economic_motivation": round(em, 1),
+        "employee_count_score": round(emp_s, 1),
+        "recency_score": round(recency_s, 1),
+        "estimated_mw_score": round(mw_s, 1),
+        "site_type": site["site_type"],
+        "owner_name": site.get("owner_name", ""),
+        "utility_id": site.get("utility_id"),
+        "estimated_mw": site.get("estimated_mw", 0),
+        "employee_count": site.get("employee_count", 0),
+        "closure_date": site.get("closure_date", ""),
+        "closure_status": site.get("closure_status", ""),
+        "sub_type": site.get("sub_type", ""),
+        "company": site.get("company", ""),
+        "location_approximate": site.get("location_approximate", False),
+    }
+
+
+# Set in each scoring worker by init_scoring_worker() so the point indexes
+# are handed over once per process, not once per chunk
+_worker_indexes = None
+
+
+def init_scoring_worker(indexes):
+    global _worker_indexes
+    _worker_indexes = indexes
+
+
+def score_chunk(items):
+    """Score (site, located) pairs, locating any site whose lookups are None.
+
+    Returns [(located, scored), ...] so the caller can cache new lookups.
+    """
+    out = []
+    for site, located in items:
+        if located is None:
+            located = locate_candidate(site["latitude"], site["longitude"], *_worker_indexes)
+        out.append((located, score_candidate(site, located)))
+    return out
 
+
+def score_candidates():
+    """Load every input dataset and score all candidate sites.
+
+    Returns the full scored list, before availability adjustments and the
+    MIN_SCORE/MAX_BROWNFIELDS output cut.
+    """
+    # Each GeoJSON file is parsed right before its features are extracted and
+    # the parsed document is dropped afterwards, so peak memory holds one
+    # source file plus the compact working lists rather than every file at once
     # Load LMP nodes
     lmp_nodes = []
     if os.path.exists(LMP_FILE):
-        with open(LMP_FILE) as f:
-            lmp_geojson = json.load(f)
+        lmp_geojson = load_json(LMP_FILE)
         for feat in lmp_geojson["features"]:
             coords = feat["geometry"]["coordinates"]
             p = feat["properties"]
@@ -499,8 +654,7 @@ def main():
     # Load ATC interfaces
     atc_nodes = []
     if os.path.exists(ATC_FILE):
-        with open(ATC_FILE) as f:
-            atc_geojson = json.load(f)
+        atc_geojson = load_json(ATC_FILE)
         for feat in atc_geojson["features"]:
             coords = feat["geometry"]["coordinates"]
             p = feat["properties"]
@@ -517,8 +671,7 @@ def main():
     # Load brownfields if available
     brownfield_sites = []
     if os.path.exists(BROWNFIELDS_FILE):
-        with open(BROWNFIELDS_FILE) as f:
-            bf_geojson = json.load(f)
+        bf_geojson = load_json(BROWNFIELDS_FILE)
         for feat in bf_geojson["features"]:
             p = feat["properties"]
             coords = feat["geometry"]["coordinates"]
@@ -534,6 +687,7 @@ def main():
                 "city": p.get("city", ""),
                 "county": p.get("county", ""),
             })
+        del bf_geojson
         print("  Brownfield sites loaded: " + str(len(brownfield_sites)))
     else:
         print("  Brownfields file not found, skipping")
@@ -542,8 +696,7 @@ def main():
     stranded_sites = []
     for sc_file, sc_label in [(WARN_FILE, "WARN closures"), (NEWS_FILE, "News closures")]:
         if os.path.exists(sc_file):
-            with open(sc_file) as f:
-                sc_geojson = json.load(f)
+            sc_geojson = load_json(sc_file)
             for feat in sc_geojson["features"]:
                 p = feat["properties"]
                 coords = feat["geometry"]["coordinates"]
@@ -571,6 +724,7 @@ def main():
     print("  Stranded capacity sites total: " + str(len(stranded_sites)))
 
     # Filter to retired/retiring plants (exclude retooled — still have active generators)
+    plants_geojson = load_json(PLANTS_FILE)
     plant_candidates = []
     retooled_skipped = 0
     for feat in plants_geojson["features"]:
@@ -580,7 +734,9 @@ def main():
             continue
         if p["status"] in ("retired", "retiring"):
             p["site_type"] = "power_plant"
+            p["fuel_id"] = FUEL_IDS.get(p.get("fuel_type"), UNKNOWN_FUEL_ID)
             plant_candidates.append(p)
+    del plants_geojson
     print("  Retired/retiring plants (>= 50 MW): " + str(len(plant_candidates)))
     if retooled_skipped > 0:
         print("  Retooled plants excluded: " + str(retooled_skipped))
@@ -589,161 +745,141 @@ def main():
     candidates = plant_candidates + brownfield_sites + stranded_sites
     print("  Total candidates: " + str(len(candidates)))
 
-    # Filter substations to 345kV+
-    hv_subs = []
-    for feat in subs_geojson["features"]:
-        p = feat["properties"]
-        v = p.get("MAX_VOLT")
-        if v is not None and float(v) >= 345:
-            hv_subs.append(p)
-    print("  Substations >= 345 kV: " + str(len(hv_subs)))
-
-    sub_coords = []
-    for s in hv_subs:
-        sub_coords.append({
-            "lat": float(s["LATITUDE"]),
-            "lon": float(s["LONGITUDE"]),
-            "max_volt": float(s["MAX_VOLT"]),
-            "lines": float(s.get("LINES") or 0),
-            "name": s.get("NAME", ""),
-        })
-
-    # Pre-extract queue withdrawal coords
-    qw_points = []
-    for feat in queue_geojson["features"]:
-        coords = feat["geometry"]["coordinates"]
-        p = feat["properties"]
-        mw = float(p.get("total_mw") or 0)
-        qw_points.append({
-            "lat": coords[1],
-            "lon": coords[0],
-            "total_mw": mw,
-        })
-    print("  Queue withdrawals loaded: " + str(len(qw_points)))
+    # Spatial lookups only depend on the location and the point datasets, so
+    # sites already located under the same datasets skip them entirely
+    spatial_key = [SPATIAL_CACHE_VERSION, QW_RADIUS_MILES] + input_key(SPATIAL_CACHE_INPUTS)
+    located_by_coords = {} if NO_CACHE else load_cache(SPATIAL_CACHE_FILE, spatial_key) or {}
+    site_coords = [(site["latitude"], site["longitude"]) for site in candidates]
+    to_locate = sum(1 for c in site_coords if c not in located_by_coords)
+    if to_locate < len(candidates):
+        print("  Spatial lookups cached: {:,} / {:,} sites".format(
+            len(candidates) - to_locate, len(candidates)))
+
+    indexes = None
+    if to_locate:
+        # Filter substations to 345kV+
+        subs_geojson = load_json(SUBSTATIONS_FILE)
+        sub_coords = []
+        for feat in subs_geojson["features"]:
+            s = feat["properties"]
+            v = s.get("MAX_VOLT")
+            if v is not None and float(v) >= 345:
+                sub_coords.append({
+                    "lat": float(s["LATITUDE"]),
+                    "lon": float(s["LONGITUDE"]),
+                    "max_volt": float(v),
+                    "lines": float(s.get("LINES") or 0),
+                    "name": s.get("NAME", ""),
+                })
+        del subs_geojson
+        print("  Substations >= 345 kV: " + str(len(sub_coords)))
+
+        # Pre-extract queue withdrawal coords
+        queue_geojson = load_json(QUEUE_FILE)
+        qw_points = []
+        for feat in queue_geojson["features"]:
+            coords = feat["geometry"]["coordinates"]
+            p = feat["properties"]
+            mw = float(p.get("total_mw") or 0)
+            qw_points.append({
+                "lat": coords[1],
+                "lon": coords[0],
+                "total_mw": mw,
+            })
+        del queue_geojson
+        print("  Queue withdrawals loaded: " + str(len(qw_points)))
+
+        # Precompute radians/cos once per point instead of once per site pair
+        indexes = (
+            build_nearest_index(sub_coords),
+            build_range_index(qw_points),
+            build_nearest_index(lmp_nodes),
+            build_nearest_index(atc_nodes),
+        )
 
     print("Scoring " + str(len(candidates)) + " sites...")
 
+    # Each site's score depends only on the read-only point indexes, so
+    # chunks are scored in worker processes and collected in input order
+    items = [(site, located_by_coords.get(c)) for site, c in zip(candidates, site_coords)]
+    chunks = [items[i:i + SCORING_CHUNK]
+              for i in range(0, len(items), SCORING_CHUNK)]
+    workers = min(os.cpu_count() or 1, len(chunks))
+    executor = None
+    if workers > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=init_scoring_worker,
+            initargs=(indexes,))
+        results = executor.map(score_chunk, chunks)
+    else:
+        init_scoring_worker(indexes)
+        results = map(score_chunk, chunks)
+
     scored = []
-    for idx, site in enumerate(candidates):
-        if (idx + 1) % 10000 == 0:
-            print("  Scored {:,} / {:,}...".format(idx + 1, len(candidates)))
-
-        lat = site["latitude"]
-        lon = site["longitude"]
-
-        # Find nearest 345kV+ substation
-        best_dist = float("inf")
-        best_sub = None
-        for sc in sub_coords:
-            d = haversine_miles(lat, lon, sc["lat"], sc["lon"])
-            if d < best_dist:
-                best_dist = d
-                best_sub = sc
-
-        nearest = {
-            "distance_miles": best_dist,
-            "max_volt": best_sub["max_volt"] if best_sub else 345,
-            "lines": best_sub["lines"] if best_sub else 0,
-            "name": best_sub["name"] if best_sub else "",
-        }
+    located = []
+    try:
+        for chunk_results in results:
+            done_before = len(scored)
+            for site_located, site_scored in chunk_results:
+                located.append(site_located)
+                scored.append(site_scored)
+            for n in range((done_before // 10000 + 1) * 10000, len(scored) + 1, 10000):
+                print("  Scored {:,} / {:,}...".format(n, len(candidates)))
+    finally:
+        # Also runs when a chunk raises or on Ctrl-C, so workers never leak;
+        # chunks not yet started are dropped rather than waited on
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if to_locate:
+        save_cache(SPATIAL_CACHE_FILE, spatial_key, dict(zip(site_coords, located)))
+
+    return scored
+
+
+def score_candidates_cached():
+    """Return score_candidates(), reusing CACHE_FILE while its inputs are unchanged.
+
+    The cache key is the mtime and size of every input file plus this script
+    and spatial_index.py, so re-running ETL or editing the scoring model
+    invalidates it.
+    """
+    key = input_key(CACHE_INPUTS)
+    if not NO_CACHE:
+        scored = load_cache(CACHE_FILE, key)
+        if scored is not None:
+            print("  (using cached scores from {})".format(
+                os.path.basename(CACHE_FILE)))
+            return scored
 
-        # Count queue withdrawals within 20 miles
-        deg_delta = 20 / 69.0
-        lon_delta = deg_delta / max(math.cos(math.radians(lat)), 0.01)
-        qw_count = 0
-        qw_total_mw = 0.0
-        for qw in qw_points:
-            if abs(qw["lat"] - lat) > deg_delta:
-                continue
-            if abs(qw["lon"] - lon) > lon_delta:
-                continue
-            d = haversine_miles(lat, lon, qw["lat"], qw["lon"])
-            if d <= 20:
-                qw_count += 1
-                qw_total_mw += qw["total_mw"]
-
-        nearby_qw = {"count": qw_count, "total_mw": qw_total_mw}
-
-        # Find nearest LMP node
-        lmp_name, lmp_avg, lmp_s = find_nearest_lmp(lat, lon, lmp_nodes) if lmp_nodes else ("", 0, 50)
-
-        # Find nearest ATC interface
-        atc_name, atc_mw, atc_s = find_nearest_atc(lat, lon, atc_nodes) if atc_nodes else ("", 0, 50)
-
-        # Score each dimension
-        ttp, dist_s, volt_s, gen_s, lines_s, qw_s = score_time_to_power(site, nearest, nearby_qw, lmp_s, atc_s)
-        sr, fuel_s, scale_s = score_site_readiness(site)
-        co, lon_s, lat_s, bb_s = score_connectivity(site)
-        rf, contam_s, status_s, flood_s = score_risk_factors(site)
-        em, emp_s, recency_s, mw_s = score_economic_motivation(site)
-
-        # Reweight composite when economic motivation is active
-        if em > 0:
-            composite = (ttp * 0.40) + (em * 0.15) + (sr * 0.15) + (co * 0.15) + (rf * 0.15)
-        else:
-            composite = (ttp * 0.50) + (sr * 0.20) + (co * 0.15) + (rf * 0.15)
-        composite = round(clamp(composite), 1)
-
-        scored.append({
-            "plant_name": site["plant_name"],
-            "state": site["state"],
-            "latitude": lat,
-            "longitude": lon,
-            "total_capacity_mw": site.get("total_capacity_mw", 0),
-            "fuel_type": site.get("fuel_type", "Brownfield"),
-            "status": site.get("status", "brownfield"),
-            "planned_retirement_date": site.get("planned_retirement_date"),
-            "composite_score": composite,
-            "time_to_power": round(ttp, 1),
-            "site_readiness": round(sr, 1),
-            "connectivity": round(co, 1),
-            "risk_factors": round(rf, 1),
-            "sub_distance_score": round(dist_s, 1),
-            "sub_voltage_score": round(volt_s, 1),
-            "gen_capacity_score": round(gen_s, 1),
-            "tx_lines_score": round(lines_s, 1),
-            "queue_withdrawal_score": round(qw_s, 1),
-            "fuel_type_score": round(fuel_s, 1),
-            "capacity_scale_score": round(scale_s, 1),
-            "longitude_score": round(lon_s, 1),
-            "latitude_score": round(lat_s, 1),
-            "broadband_score": round(bb_s, 1),
-            "contamination_score": round(contam_s, 1),
-            "operational_status_score": round(status_s, 1),
-            "flood_zone_score": round(flood_s, 1),
-            "lmp_score": round(lmp_s, 1),
-            "nearest_lmp_avg": round(lmp_avg, 1),
-            "nearest_lmp_node": lmp_name,
-            "atc_score": round(atc_s, 1),
-            "nearest_atc_mw": round(atc_mw, 1),
-            "nearest_atc_interface": atc_name,
-            "nearest_sub_name": nearest["name"],
-            "nearest_sub_distance_miles": round(best_dist, 1),
-            "nearest_sub_voltage_kv": nearest["max_volt"],
-            "nearest_sub_lines": nearest["lines"],
-            "queue_count_20mi": qw_count,
-            "queue_mw_20mi": round(qw_total_mw, 1),
-            "economic_motivation": round(em, 1),
-            "employee_count_score": round(emp_s, 1),
-            "recency_score": round(recency_s, 1),
-            "estimated_mw_score": round(mw_s, 1),
-            "site_type": site["site_type"],
-            "owner_name": site.get("owner_name", ""),
-            "utility_id": site.get("utility_id"),
-            "estimated_mw": site.get("estimated_mw", 0),
-            "employee_count": site.get("employee_count", 0),
-            "closure_date": site.get("closure_date", ""),
-            "closure_status": site.get("closure_status", ""),
-            "sub_type": site.get("sub_type", ""),
-            "company": site.get("company", ""),
-            "location_approximate": site.get("location_approximate", False),
-        })
+    scored = score_candidates()
+    save_cache(CACHE_FILE, key, scored)
+    return scored
+
+
+# ── Main ──────────────────────────────────────────────────────────────────
+
+
+def main():
+    # Load old scored sites for comparison
+    old_top10 = []
+    if os.path.exists(OUTPUT_FILE):
+        old_geojson = load_json(OUTPUT_FILE)
+        for feat in old_geojson["features"][:10]:
+            p = feat["properties"]
+            old_top10.append({
+                "plant_name": p["plant_name"],
+                "state": p["state"],
+                "composite_score": p["composite_score"],
+            })
+
+    print("Loading data...")
+    scored = score_candidates_cached()
 
     # Load availability data from Deal Scout (if available)
     availability = {}
     if os.path.exists(AVAILABILITY_FILE):
-        with open(AVAILABILITY_FILE) as f:
-            avail_data = json.load(f)
+        avail_data = load_json(AVAILABILITY_FILE)
         availability = avail_data.get("sites", {})
         print("  Availability data loaded: {} sites".format(len(availability)))
     else:
@@ -771,51 +907,51 @@ def main():
         print("  Excluded (taken/still_operating): {}".format(excluded))
         scored = [s for s in scored if not s.get("_excluded")]
 
-    # Sort by composite score descending
     # Include ALL power plants and stranded capacity sites >= MIN_SCORE
-    # Cap brownfields to MAX_BROWNFIELDS to keep output manageable
-    scored.sort(key=lambda x: -x["composite_score"])
-    top = []
-    bf_count_added = 0
-    for s in scored:
-        if s["composite_score"] < MIN_SCORE:
-            continue
-        if s["site_type"] == "brownfield":
-            if bf_count_added >= MAX_BROWNFIELDS:
-                continue
-            bf_count_added += 1
-        top.append(s)
-
-    # Build GeoJSON
-    features = []
-    for s in top:
-        features.append({
+    # Cap brownfields to MAX_BROWNFIELDS to keep output manageable.
+    # Brownfields dominate the candidate list, so pick their top-K with a heap
+    # and only sort the few hundred sites that make the output.
+    def by_score(x):
+        return x["composite_score"]
+
+    top = [s for s in scored if s["composite_score"] >= MIN_SCORE]
+    brownfields = [s for s in top if s["site_type"] == "brownfield"]
+    if len(brownfields) > MAX_BROWNFIELDS:
+        keep = set(map(id, heapq.nlargest(MAX_BROWNFIELDS, brownfields, key=by_score)))
+        top = [s for s in top if s["site_type"] != "brownfield" or id(s) in keep]
+
+    # Sort by composite score descending
+    top.sort(key=by_score, reverse=True)
+
+    # Build GeoJSON; only the selected sites get a Feature wrapper, and the
+    # scored dict is reused as its properties rather than copied
+    features = [
+        {
             "type": "Feature",
             "geometry": {
                 "type": "Point",
                 "coordinates": [s["longitude"], s["latitude"]],
             },
             "properties": s,
-        })
-
-    geojson = {"type": "FeatureCollection", "features": features}
+        }
+        for s in top
+    ]
 
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f, indent=2)
+    write_geojson(features, OUTPUT_FILE)
 
     file_size = round(os.path.getsize(OUTPUT_FILE) / 1024, 1)
 
     # ── Comparison: Old Top 10 vs New Top 10 ──────────────────────────────
     if old_top10:
-        print("")
-        print("=" * 100)
-        print("OLD TOP 10 vs NEW TOP 10")
-        print("=" * 100)
-        print("{:>3}  {:<32} {:>2} {:>6}   |  {:>3}  {:<32} {:>2} {:>6}".format(
-            "#", "OLD", "ST", "Score", "#", "NEW", "ST", "Score"
-        ))
-        print("-" * 100)
+        row_fmt = "{:>3}  {:<32} {:>2} {:>6}   |  {:>3}  {:<32} {:>2} {:>6}"
+        rows = [
+            "",
+            "=" * 100,
+            "OLD TOP 10 vs NEW TOP 10",
+            "=" * 100,
+            row_fmt.format("#", "OLD", "ST", "Score", "#", "NEW", "ST", "Score"),
+            "-" * 100,
+        ]
         for i in range(10):
             old_name = ""
             old_st = ""
@@ -834,28 +970,26 @@ def main():
                 if old_top10[i]["plant_name"] != top[i]["plant_name"]:
                     marker = " *"
 
-            print("{:>3}  {:<32} {:>2} {:>6}   |  {:>3}  {:<32} {:>2} {:>6}{}".format(
+            rows.append(row_fmt.format(
                 i + 1, old_name, old_st, old_sc,
-                i + 1, new_name, new_st, new_sc, marker
-            ))
-        print("")
-        print("  * = position changed from old ranking")
+                i + 1, new_name, new_st, new_sc
+            ) + marker)
+        rows.append("")
+        rows.append("  * = position changed from old ranking")
+        print("\n".join(rows))
 
     # ── Print summary table ───────────────────────────────────────────────
-    print("")
-    print("=" * 140)
-    print("TOP 20 ADAPTIVE REUSE SITES (ALL SITE TYPES)")
-    print("=" * 140)
+    # Rows are collected and written with a single print per block
     header = "{:>3}  {:<30} {:>2}  {:>7}  {:>12}  {:>10}  {:>5}  {:>5}  {:>5}  {:>5}  {:>6}  {:>6}".format(
         "#", "Site Name", "ST", "Score", "Capacity MW", "Type", "TTP", "SiteR", "Conn", "Risk", "SubMi", "SubkV"
     )
-    print(header)
-    print("-" * 140)
+    row_fmt = "{:>3}  {:<30} {:>2}  {:>7}  {}  {:>10}  {:>5}  {:>5}  {:>5}  {:>5}  {:>6}  {:>6,.0f}"
+    rows = ["", "=" * 140, "TOP 20 ADAPTIVE REUSE SITES (ALL SITE TYPES)", "=" * 140, header, "-" * 140]
     for i, s in enumerate(top[:20]):
         name = s["plant_name"][:30]
         site_type = "Plant" if s["site_type"] == "power_plant" else "Brown"
         cap_str = "{:>10,.0f}".format(s["total_capacity_mw"]) if s["total_capacity_mw"] > 0 else "       N/A"
-        print("{:>3}  {:<30} {:>2}  {:>7}  {}  {:>10}  {:>5}  {:>5}  {:>5}  {:>5}  {:>6}  {:>6,.0f}".format(
+        rows.append(row_fmt.format(
             i + 1,
             name,
             s["state"],
@@ -869,18 +1003,21 @@ def main():
             s["nearest_sub_distance_miles"],
             s["nearest_sub_voltage_kv"],
         ))
+    print("\n".join(rows))
 
     # Count by type
     type_counts = {}
     for s in top:
         st = s["site_type"]
         type_counts[st] = type_counts.get(st, 0) + 1
-    print("")
-    print("Output: " + OUTPUT_FILE + " (" + str(file_size) + " KB)")
-    print("Sites >= " + str(MIN_SCORE) + " score: " + str(len(top)))
+    rows = [
+        "",
+        "Output: " + OUTPUT_FILE + " (" + str(file_size) + " KB)",
+        "Sites >= " + str(MIN_SCORE) + " score: " + str(len(top)),
+    ]
     for t, c in sorted(type_counts.items(), key=lambda x: -x[1]):
-        print("  {:25s} {}".format(t, c))
-    print("Total scored: " + str(len(scored)))
+        rows.append("  {:25s} {}".format(t, c))
+    rows.append("Total scored: " + str(len(scored)))
 
     # Score distribution
     brackets = {"90+": 0, "80-89": 0, "70-79": 0, "60-69": 0, "<60": 0}
@@ -896,9 +1033,10 @@ def main():
             brackets["60-69"] += 1
         else:
             brackets["<60"] += 1
-    print("Score distribution (all " + str(len(scored)) + " sites):")
+    rows.append("Score distribution (all " + str(len(scored)) + " sites):")
     for k, v in brackets.items():
-        print("  " + k + ": " + str(v))
+        rows.append("  " + k + ": " + str(v))
+    print("\n".join(rows))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+"""
+Point lookups shared by the pipeline scripts.
+
+build_nearest_index() / nearest_point() answer "closest point to here";
+build_range_index() / points_within() answer "every point within r miles".
+Indexed points are dicts with "lat"/"lon" keys in degrees.
+"""
+
+import bisect
+import math
+
+R_MILES = 3958.8
+# Grid cell size for range indexes (~35 mi of latitude)
+RANGE_CELL_DEG = 0.5
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in miles."""
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (math.sin(dlat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(dlon / 2) ** 2)
+    # asin(sqrt(a)) == atan2(sqrt(a), sqrt(1 - a)) for a in [0, 1], minus a sqrt
+    return R_MILES * 2 * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_terms(lat, lon):
+    """Return (half_lat_rad, half_lon_rad, cos_lat) for the query side of a scan."""
+    lat_r = math.radians(lat)
+    return lat_r / 2, math.radians(lon) / 2, math.cos(lat_r)
+
+
+def build_nearest_index(points):
+    """Latitude-sorted point index for nearest_point().
+
+    Returns (half_lats, entries) where entries are
+    (half_lat_rad, half_lon_rad, cos_lat, position, point) sorted by latitude
+    and half_lats is the matching key list for bisect. position is the
+    point's place in the input list, used to break distance ties the same
+    way a front-to-back scan would. Halving is exact in floating point, so
+    sin(h2 - h1) gives the same value as sin((r2 - r1) / 2).
+    """
+    entries = []
+    for pos, p in enumerate(points):
+        half_lat, half_lon, cos_lat = haversine_terms(p["lat"], p["lon"])
+        entries.append((half_lat, half_lon, cos_lat, pos, p))
+    entries.sort(key=lambda e: (e[0], e[3]))
+    return [e[0] for e in entries], entries
+
+
+def nearest_point(lat, lon, index, terms=None):
+    """Return (distance_miles, point) for the nearest entry of a nearest index.
+
+    Walks outward from the query latitude in both directions. Since
+    a >= sin(dlat/2)^2, a side stops once its latitude gap alone exceeds the
+    best `a` found, so most points are never visited. Candidates are ranked on
+    the haversine `a` term, which is monotonic in distance, so only the
+    winner pays for sqrt/asin. terms is haversine_terms(lat, lon), for
+    callers that query several indexes from the same location. An empty
+    index gives (inf, None).
+    """
+    half_lats, entries = index
+    half_lat, half_lon, cos_lat = terms or haversine_terms(lat, lon)
+    sin = math.sin
+    best_a = float("inf")
+    best_pos = -1
+    best = None
+    hi = bisect.bisect_left(half_lats, half_lat)
+    lo = hi - 1
+    n = len(entries)
+    while lo >= 0 or hi < n:
+        # Step whichever side is closer in latitude
+        if hi >= n or (lo >= 0 and half_lat - half_lats[lo] <= half_lats[hi] - half_lat):
+            e_half_lat, e_half_lon, e_cos, pos, p = entries[lo]
+            lo -= 1
+        else:
+            e_half_lat, e_half_lon, e_cos, pos, p = entries[hi]
+            hi += 1
+        s_lat = sin(e_half_lat - half_lat)
+        lat_a = s_lat * s_lat
+        if lat_a > best_a:
+            # Every remaining point is at least this far in latitude
+            break
+        s_lon = sin(e_half_lon - half_lon)
+        a = lat_a + cos_lat * e_cos * s_lon * s_lon
+        if a < best_a or (a == best_a and pos < best_pos):
+            best_a = a
+            best_pos = pos
+            best = p
+    if best is None:
+        return float("inf"), None
+    return haversine_miles(lat, lon, best["lat"], best["lon"]), best
+
+
+def unit_vector(lat, lon):
+    """Return the (x, y, z) unit-sphere (ECEF) vector for a lat/lon in degrees."""
+    lat_r = math.radians(lat)
+    lon_r = math.radians(lon)
+    cos_lat = math.cos(lat_r)
+    return cos_lat * math.cos(lon_r), cos_lat * math.sin(lon_r), math.sin(lat_r)
+
+
+def build_range_index(points):
+    """Grid index of RANGE_CELL_DEG cells for points_within().
+
+    Returns {(lat_cell, lon_cell): [(lat, lon, x, y, z, position, point), ...]}
+    with (x, y, z) from unit_vector(). Cells are floor(deg / RANGE_CELL_DEG),
+    so negative longitudes bucket the same way as positive ones.
+    """
+    grid = {}
+    floor = math.floor
+    for pos, p in enumerate(points):
+        x, y, z = unit_vector(p["lat"], p["lon"])
+        cell = (floor(p["lat"] / RANGE_CELL_DEG), floor(p["lon"] / RANGE_CELL_DEG))
+        grid.setdefault(cell, []).append((p["lat"], p["lon"], x, y, z, pos, p))
+    return grid
+
+
+def points_within(lat, lon, radius_miles, radius_a, index):
+    """Return the points of a range index within radius_miles, in input order.
+
+    radius_a is the haversine `a` term at radius_miles. Only the grid cells
+    overlapping the query's lat/lon bounding box are visited, then the box
+    itself and a squared-chord test decide each point. On the unit sphere
+    chord^2 = 4 * a, so comparing against 4 * radius_a is the haversine radius
+    test without any per-point trig. The box is sized from cos(lat), so
+    high-latitude queries span more longitude cells. Matches come back in
+    their original input order so sums over them add up exactly as a
+    front-to-back scan would.
+    """
+    lat_r = math.radians(lat)
+    lon_r = math.radians(lon)
+    cos_lat = math.cos(lat_r)
+    x = cos_lat * math.cos(lon_r)
+    y = cos_lat * math.sin(lon_r)
+    z = math.sin(lat_r)
+    chord2 = 4 * radius_a
+    deg_delta = radius_miles / 69.0
+    lon_delta = deg_delta / max(cos_lat, 0.01)
+    floor = math.floor
+    lon_cells = range(floor((lon - lon_delta) / RANGE_CELL_DEG),
+                      floor((lon + lon_delta) / RANGE_CELL_DEG) + 1)
+    matches = []
+    for lat_cell in range(floor((lat - deg_delta) / RANGE_CELL_DEG),
+                          floor((lat + deg_delta) / RANGE_CELL_DEG) + 1):
+        for lon_cell in lon_cells:
+            cell = index.get((lat_cell, lon_cell))
+            if cell is None:
+                continue
+            for e_lat, e_lon, e_x, e_y, e_z, pos, p in cell:
+                if abs(e_lat - lat) > deg_delta or abs(e_lon - lon) > lon_delta:
+                    continue
+                dx = e_x - x
+                dy = e_y - y
+                dz = e_z - z
+                if dx * dx + dy * dy + dz * dz <= chord2:
+                    matches.append((pos, p))
+    if len(matches) > 1:
+        matches.sort(key=lambda m: m[0])
+    return [p for _, p in matches]
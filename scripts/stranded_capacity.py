@@ -34,6 +34,9 @@ import urllib.parse
 import urllib.request
 from datetime import datetime, timedelta, timezone
 
+from json_io import load_json, write_geojson
+from spatial_index import build_nearest_index, build_range_index, nearest_point, points_within
+
 CUTOFF_MONTHS = 24  # Only include closures from the last 24 months
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -58,6 +61,9 @@ INDUSTRY_KEYWORDS = [
 
 MIN_EMPLOYEES = 200
 MIN_MW = 30
+TX_RADIUS_MILES = 10
+# Haversine `a` term at TX_RADIUS_MILES, for points_within()
+TX_RADIUS_A = math.sin(TX_RADIUS_MILES / 3958.8 / 2) ** 2
 
 # Estimated MW by facility sub-type
 MW_ESTIMATES = {
@@ -122,16 +128,6 @@ def normalize_date(date_str):
     return dt.strftime("%Y-%m-%d")
 
 
-def haversine_miles(lat1, lon1, lat2, lon2):
-    R = 3958.8
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat / 2) ** 2 +
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-         math.sin(dlon / 2) ** 2)
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-
 def estimate_mw(text):
     """Estimate MW from facility description text."""
     text_lower = text.lower()
@@ -358,18 +354,19 @@ def lookup_facility_address(company, city, state):
 
 
 _substations = None
-_transmission = None
+_substation_index = None  # build_nearest_index() of _substations
+_transmission_index = None  # build_range_index() of HV line endpoints
 
 
 def load_substations():
-    global _substations
+    global _substations, _substation_index
     if _substations is not None:
         return _substations
     if not os.path.exists(SUBSTATIONS_FILE):
         _substations = []
+        _substation_index = build_nearest_index(_substations)
         return _substations
-    with open(SUBSTATIONS_FILE) as f:
-        geo = json.load(f)
+    geo = load_json(SUBSTATIONS_FILE)
     _substations = []
     for feat in geo["features"]:
         p = feat["properties"]
@@ -382,34 +379,26 @@ def load_substations():
                 "max_volt": float(v),
                 "name": p.get("NAME", ""),
             })
+    _substation_index = build_nearest_index(_substations)
     return _substations
 
 
 def find_nearest_substation(lat, lon):
     """Find nearest substation >= 138kV. Returns (name, distance_mi, voltage) or None."""
-    subs = load_substations()
-    best_dist = float("inf")
-    best = None
-    for s in subs:
-        d = haversine_miles(lat, lon, s["lat"], s["lon"])
-        if d < best_dist:
-            best_dist = d
-            best = s
+    load_substations()
+    dist, best = nearest_point(lat, lon, _substation_index)
     if best is None:
         return None
-    return best["name"], round(best_dist, 1), best["max_volt"]
+    return best["name"], round(dist, 1), best["max_volt"]
 
 
 def find_nearest_hv_transmission(lat, lon):
-    """Find nearest transmission line >= 345kV within 20 miles. Returns voltage or None."""
-    global _transmission
-    if _transmission is None:
-        if not os.path.exists(TRANSMISSION_FILE):
-            _transmission = []
-        else:
-            with open(TRANSMISSION_FILE) as f:
-                geo = json.load(f)
-            _transmission = []
+    """Highest voltage among >= 345kV line endpoints within 10 miles. Returns voltage or None."""
+    global _transmission_index
+    if _transmission_index is None:
+        endpoints = []
+        if os.path.exists(TRANSMISSION_FILE):
+            geo = load_json(TRANSMISSION_FILE)
             for feat in geo["features"]:
                 v = feat["properties"].get("VOLTAGE")
                 if v is not None and float(v) >= 345:
@@ -422,23 +411,14 @@ def find_nearest_hv_transmission(lat, lon):
                             coords.extend(seg)
                     if coords:
                         # Store just first and last point for rough proximity
-                        _transmission.append({
-                            "voltage": float(v),
-                            "points": [(coords[0][1], coords[0][0]),
-                                       (coords[-1][1], coords[-1][0])],
-                        })
-
-    deg_delta = 20 / 69.0
-    best_voltage = None
-    for t in _transmission:
-        for p in t["points"]:
-            if abs(p[0] - lat) > deg_delta or abs(p[1] - lon) > deg_delta:
-                continue
-            d = haversine_miles(lat, lon, p[0], p[1])
-            if d <= 10:
-                if best_voltage is None or t["voltage"] > best_voltage:
-                    best_voltage = t["voltage"]
-    return best_voltage
+                        for pt in (coords[0], coords[-1]):
+                            endpoints.append({"lat": pt[1], "lon": pt[0], "voltage": float(v)})
+        _transmission_index = build_range_index(endpoints)
+
+    nearby = points_within(lat, lon, TX_RADIUS_MILES, TX_RADIUS_A, _transmission_index)
+    if not nearby:
+        return None
+    return max(p["voltage"] for p in nearby)
 
 
 def build_feature(name, lat, lon, state, source, sub_type, company, location,
@@ -1151,8 +1131,7 @@ def run_eia_strategy(states, dry_run=False):
         print("  SKIP — utility-territories.geojson not found")
         return {}
 
-    with open(terr_file) as f:
-        terr_geo = json.load(f)
+    terr_geo = load_json(terr_file)
 
     # Filter to target states and major utilities
     utilities = []
@@ -1471,11 +1450,9 @@ def run_news_strategy(states, dry_run=False):
 # ── Main ──────────────────────────────────────────────────────────────────
 
 
-def write_geojson(features, output_path):
-    geo = {"type": "FeatureCollection", "features": features}
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(geo, f, indent=2)
+def write_output(features, output_path):
+    """Write closure features as GeoJSON and report the file size."""
+    write_geojson(features, output_path)
     size = round(os.path.getsize(output_path) / 1024, 1)
     print("  Output: {} ({} KB, {} features)".format(output_path, size, len(features)))
 
@@ -1516,12 +1493,12 @@ def main():
     if run_all or args.warn_only:
         warn_features = run_warn_strategy(states, args.dry_run)
         if warn_features:
-            write_geojson(warn_features, WARN_OUTPUT)
+            write_output(warn_features, WARN_OUTPUT)
 
     if run_all or args.news_only:
         news_features = run_news_strategy(states, args.dry_run)
         if news_features:
-            write_geojson(news_features, NEWS_OUTPUT)
+            write_output(news_features, NEWS_OUTPUT)
 
     if run_all or args.eia_only:
         eia_results = run_eia_strategy(states, args.dry_run)
@@ -23,9 +23,9 @@ Usage:
 """
 
 import csv
+import heapq
 import io
 import json
-import math
 import os
 import re
 import sqlite3
@@ -36,6 +36,9 @@ import urllib.parse
 import urllib.request
 from datetime import datetime, timedelta, timezone
 
+from json_io import load_json, write_geojson
+from spatial_index import build_nearest_index, nearest_point
+
 # ── Config ───────────────────────────────────────────────────────────────
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -129,16 +132,6 @@ def parse_employees(emp_str):
         return 0
 
 
-def haversine_miles(lat1, lon1, lat2, lon2):
-    R = 3958.8
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat / 2) ** 2 +
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-         math.sin(dlon / 2) ** 2)
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-
 def fetch_csv(url, timeout=60):
     req = urllib.request.Request(url, headers={
         "User-Agent": "GridSite-WARNIngest/1.0 (brian@gridsite.dev)"
@@ -287,18 +280,19 @@ def mapbox_geocode_city_fallback(address, state):
 # ── Substation Proximity ─────────────────────────────────────────────────
 
 _substations = None
+_substation_index = None  # build_nearest_index() of _substations
 
 def load_substations():
-    global _substations
+    global _substations, _substation_index
     if _substations is not None:
         return _substations
     if not os.path.exists(SUBSTATIONS_FILE):
         print("  WARNING: substations.geojson not found — skipping proximity")
         _substations = []
+        _substation_index = build_nearest_index(_substations)
         return _substations
     print("  Loading substations...")
-    with open(SUBSTATIONS_FILE) as f:
-        geo = json.load(f)
+    geo = load_json(SUBSTATIONS_FILE)
     _substations = []
     for feat in geo["features"]:
         p = feat["properties"]
@@ -311,25 +305,18 @@ def load_substations():
                 "max_volt": float(v),
                 "name": p.get("NAME", ""),
             })
+    _substation_index = build_nearest_index(_substations)
     print("  Loaded {} substations (138kV+)".format(len(_substations)))
     return _substations
 
 
 def find_nearest_substation(lat, lon):
     """Returns (name, distance_miles, voltage_kv) or None."""
-    subs = load_substations()
-    if not subs:
-        return None
-    best_dist = float("inf")
-    best = None
-    for s in subs:
-        d = haversine_miles(lat, lon, s["lat"], s["lon"])
-        if d < best_dist:
-            best_dist = d
-            best = s
+    load_substations()
+    dist, best = nearest_point(lat, lon, _substation_index)
     if best is None:
         return None
-    return best["name"], round(best_dist, 1), best["max_volt"]
+    return best["name"], round(dist, 1), best["max_volt"]
 
 
 # ── Data Fetching ────────────────────────────────────────────────────────
@@ -432,8 +419,7 @@ def parse_national_csv(text, label):
 def load_existing_warn_data():
     if not os.path.exists(EXISTING_WARN_FILE):
         return []
-    with open(EXISTING_WARN_FILE) as f:
-        geo = json.load(f)
+    geo = load_json(EXISTING_WARN_FILE)
     features = geo.get("features", [])
     print("  Loaded {} existing features from warn-closures.geojson".format(len(features)))
     return features
@@ -490,9 +476,8 @@ def main():
                 big += 1
         print("  500+ employees: {}".format(big))
         print("  States: {}".format(len(states)))
-        unique_records.sort(key=lambda r: r["employees"], reverse=True)
         print("\n  Top 15 by employees:")
-        for r in unique_records[:15]:
+        for r in heapq.nlargest(15, unique_records, key=lambda r: r["employees"]):
             print("    {:>5} — {} ({}, {})".format(r["employees"], r["company"], r["city"], r["state"]))
         print("\n  By state:")
         for s, c in sorted(states.items(), key=lambda x: -x[1]):
@@ -623,9 +608,7 @@ def main():
 
     # Step 5: Output
     print("\n--- Step 5: Writing output ---")
-    geojson = {"type": "FeatureCollection", "features": features}
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(geojson, f)
+    write_geojson(features, OUTPUT_FILE)
 
     # Stats
     total = len(features)